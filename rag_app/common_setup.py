@@ -3,7 +3,10 @@
 Common setup for all RAG app scripts.
 
 This module ensures all scripts use the correct working directory and paths.
-Import this at the top of any RAG app script to avoid path issues.
+Call setup_environment() at the top of any RAG app script to avoid path issues.
+Importing the module has no side effects, so library code can use the path
+helpers without changing the process working directory. It also holds the
+retrieval cache and other pieces shared by the RAG systems.
 
 Usage:
     from rag_app.common_setup import setup_environment
@@ -12,23 +15,43 @@ Usage:
 
 import sys
 import os
+import copy
 from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional
+
+
+_SETUP_DONE = False
+
+# Number of retrieval results kept for repeated questions in a session
+RETRIEVAL_CACHE_SIZE = 256
+
+# Appended to a streamed LLM answer when the stream fails partway through
+TRUNCATED_ANSWER_NOTICE = "\n\n[Answer truncated: the response stream was interrupted.]"
 
 
 def setup_environment():
     """
     Set up the environment for RAG app scripts.
     This should be called at the beginning of every RAG app script.
+    Repeated calls are no-ops.
     """
+    global _SETUP_DONE
+    
     # Get project root directory
-    project_root = Path(__file__).parent.parent
+    project_root = get_project_root()
+    
+    if _SETUP_DONE:
+        return project_root
     
     # Add project root to Python path
-    sys.path.insert(0, str(project_root))
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
     
     # Change to project root directory so all paths work correctly
-    os.chdir(project_root)
+    if Path.cwd() != project_root.resolve():
+        os.chdir(project_root)
     
+    _SETUP_DONE = True
     return project_root
 
 
@@ -52,5 +75,47 @@ def get_vector_db_path():
     return get_storage_path() / "vector_db"
 
 
-# Auto-setup when imported
-setup_environment()
+class RetrievalCache:
+    """
+    Bounded (query, n_results) -> retrieved chunks cache for the RAG systems.
+    
+    Entries are evicted oldest first and empty results are not cached. Chunks
+    are copied on the way in and out, so a caller that edits a returned chunk
+    does not change later answers. The cache empties itself when the store
+    version it is given changes, e.g. after new chunks are stored.
+    """
+    
+    def __init__(self, max_size: int = RETRIEVAL_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = {}  # key -> tuple of chunk dicts, oldest first
+        self._version = None
+    
+    def _check_version(self, version: Any) -> None:
+        """Drop every entry if the vector store changed since they were cached."""
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+    
+    def contains(self, key: Hashable, version: Any = None) -> bool:
+        """Whether chunks are cached for key under the given store version."""
+        self._check_version(version)
+        return key in self._entries
+    
+    def get(self, key: Hashable, version: Any = None) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the chunks cached for key, or None."""
+        self._check_version(version)
+        chunks = self._entries.get(key)
+        return None if chunks is None else copy.deepcopy(list(chunks))
+    
+    def put(self, key: Hashable, chunks: List[Dict[str, Any]], version: Any = None) -> None:
+        """Cache a copy of non-empty chunks for key, evicting the oldest entry."""
+        self._check_version(version)
+        if not chunks:
+            return
+        if key not in self._entries and len(self._entries) >= self.max_size:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = tuple(copy.deepcopy(chunks))
+    
+    def clear(self) -> None:
+        """Forget every cached retrieval."""
+        self._entries.clear()
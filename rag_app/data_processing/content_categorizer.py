@@ -4,12 +4,48 @@ Content Categorization System for System Design Blog Posts
 This module provides various approaches to categorize blog content by system design topics.
 """
 
+import hashlib
+import heapq
 import json
+import os
+import re
 import sqlite3
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from joblib import Parallel, delayed
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from tqdm import tqdm
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Below this many blogs the worker processes' startup cost outweighs their speedup
+PARALLEL_MIN_BLOGS = 200
+
+# Blogs per scoring task; the progress bar advances as each task finishes
+CATEGORIZE_SLICE_SIZE = 256
+
+# Number of blog score rows kept for duplicate blogs
+SCORE_CACHE_SIZE = 10_000
+
+
+def _content_hash(text: str):
+    """Fast 64-bit fingerprint of blog text, used as a score cache key."""
+    data = text.encode('utf-8')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(data)
+    return hashlib.blake2b(data, digest_size=8).digest()
 
 
 class ContentCategorizer:
@@ -17,6 +53,21 @@ class ContentCategorizer:
     Categorizes blog content by system design topics using multiple approaches.
     """
     
+    # Topic descriptions for TF-IDF comparison
+    TOPIC_DESCRIPTIONS = {
+        "distributed_systems": "microservices architecture distributed systems scalability load balancing consistency availability partition tolerance service mesh API gateway",
+        "databases": "database design SQL NoSQL sharding replication indexing query optimization ACID transactions data modeling consistency",
+        "caching": "cache strategies Redis Memcached CDN cache invalidation performance optimization distributed cache TTL",
+        "messaging": "message queues Kafka RabbitMQ pub/sub event streaming asynchronous communication producer consumer",
+        "monitoring": "monitoring logging metrics tracing observability APM alerting performance distributed tracing health checks",
+        "security": "authentication authorization OAuth JWT encryption security vulnerabilities access control RBAC zero trust",
+        "deployment": "CI/CD Docker Kubernetes containerization orchestration DevOps infrastructure automation blue green canary",
+        "scalability": "scalability performance throughput latency auto scaling load testing capacity planning optimization",
+        "machine_learning": "machine learning ML model training feature engineering data pipeline model serving inference batch processing real-time ML MLOps model deployment A/B testing model versioning data drift model monitoring feature store model registry pipeline orchestration",
+        "ai_llm_systems": "LLM large language model GPT transformer embedding vector database RAG retrieval augmented generation semantic search vector similarity prompt engineering fine-tuning in-context learning AI agent chatbot conversational AI text generation natural language processing NLP tokenization attention mechanism neural network deep learning",
+        "data_engineering": "data pipeline ETL ELT data warehouse data lake data processing batch processing stream processing Apache Spark Apache Flink data ingestion data transformation data quality data governance data lineage data catalog schema evolution data partitioning"
+    }
+    
     def __init__(self):
         """Initialize the categorizer with system design topics."""
         self.system_design_topics = {
@@ -100,6 +151,100 @@ class ContentCategorizer:
             "Databricks": {"data_engineering": 1.4, "machine_learning": 1.3, "scalability": 1.1},
             "Snowflake": {"data_engineering": 1.3, "databases": 1.2, "scalability": 1.1}
         }
+        
+        # Column order for all (n_blogs, n_topics) score matrices
+        self.topic_names = list(self.system_design_topics.keys())
+        self._topic_index = {topic: i for i, topic in enumerate(self.topic_names)}
+        
+        # Keyword + TF-IDF score rows (before company weights) keyed by
+        # (title, content hash), so duplicate blogs are only scored once;
+        # oldest first, bounded by SCORE_CACHE_SIZE
+        self._score_cache = {}
+        
+        # Company weights as a (n_companies + 1, n_topics) matrix; the last row is
+        # all ones and is used for companies without specific weights
+        self._company_index = {company: i for i, company in enumerate(self.company_weights)}
+        self._weight_matrix = np.ones((len(self._company_index) + 1, len(self.topic_names)), dtype=np.float32)
+        for company, weights in self.company_weights.items():
+            for topic, weight in weights.items():
+                self._weight_matrix[self._company_index[company], self._topic_index[topic]] = weight
+        
+        # The topic corpus is fixed, so fit the TF-IDF model once and cache the topic vectors.
+        # Rows are L2-normalized, so cosine similarity is a plain dot product.
+        vectorizer = TfidfVectorizer(
+            stop_words='english',
+            max_features=1000,
+            ngram_range=(1, 2),  # Include bigrams
+            norm='l2',
+            lowercase=False,
+            dtype=np.float32
+        )
+        topic_matrix = vectorizer.fit_transform(
+            [self.TOPIC_DESCRIPTIONS[topic].lower() for topic in self.topic_names]
+        )
+        
+        # Blog text is scored without sklearn: keep the fitted vocabulary and IDF weights,
+        # and count vocabulary terms directly (see _term_ids)
+        self._vocabulary = vectorizer.vocabulary_
+        self._idf = vectorizer.idf_.astype(np.float32)
+        self._topic_vectors = topic_matrix.toarray().T  # (n_terms, n_topics)
+        self._stop_words = vectorizer.get_stop_words()
+        self._token_pattern = re.compile(vectorizer.token_pattern)
+        # Only tokens that start a vocabulary bigram need a bigram lookup
+        self._bigram_heads = {term.split(' ')[0] for term in self._vocabulary if ' ' in term}
+        
+        # Map each keyword to the topics that list it and compile them into a single
+        # Aho-Corasick automaton, so a text is scanned once regardless of keyword count
+        self._keyword_topics = defaultdict(list)
+        for topic, keywords in self.system_design_topics.items():
+            for keyword in keywords:
+                self._keyword_topics[keyword].append(topic)
+        
+        self._keyword_automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword in self._keyword_topics:
+                self._keyword_automaton.add_word(keyword, keyword)
+            self._keyword_automaton.make_automaton()
+        # A keyword spanning the space between title and content fits in this many
+        # characters on either side of it
+        self._keyword_overlap = max(len(keyword) for keyword in self._keyword_topics) - 1
+    
+    def __getstate__(self) -> dict:
+        """Pickle the fitted model for worker processes, without the score cache."""
+        state = self.__dict__.copy()
+        state['_score_cache'] = {}
+        return state
+    
+    def _find_keywords(self, text: str) -> set:
+        """
+        Find the distinct keywords that occur in the text.
+        
+        Args:
+            text: Text to scan (already lowercased by the caller)
+            
+        Returns:
+            Set of keywords present
+        """
+        if self._keyword_automaton is not None:
+            return {keyword for _, keyword in self._keyword_automaton.iter(text)}
+        return {keyword for keyword in self._keyword_topics if keyword in text}
+    
+    def _count_topic_keywords(self, found: set) -> Counter:
+        """
+        Count, per topic, how many of its keywords were found.
+        
+        Args:
+            found: Keywords present in a text
+            
+        Returns:
+            Counter mapping topic to number of distinct keywords present
+        """
+        topic_counts = Counter()
+        for keyword in found:
+            for topic in self._keyword_topics[keyword]:
+                topic_counts[topic] += 1
+        return topic_counts
     
     def categorize_by_keywords(self, text_content: str, title: str = "") -> Dict[str, float]:
         """
@@ -112,20 +257,39 @@ class ContentCategorizer:
         Returns:
             Dictionary with topic scores
         """
-        # Combine title and content for analysis
-        full_text = f"{title} {text_content}".lower()
+        return self._score_keywords(text_content.lower(), title.lower())
+    
+    def _score_keywords(self, content_lower: str, title_lower: str) -> Dict[str, float]:
+        """
+        Keyword scores for a lowercased title and content.
+        
+        Title and content are scanned separately instead of as one joined
+        string; keywords spanning the join are found by scanning the few
+        characters around it.
+        
+        Args:
+            content_lower: Lowercased content
+            title_lower: Lowercased title
+            
+        Returns:
+            Dictionary with topic scores
+        """
+        # Count keyword matches over "title content"
+        overlap = self._keyword_overlap
+        title_found = self._find_keywords(title_lower)
+        text_found = (self._find_keywords(content_lower) | title_found |
+                      self._find_keywords(f"{title_lower[-overlap:]} {content_lower[:overlap]}"))
+        text_matches = self._count_topic_keywords(text_found)
+        title_matches = self._count_topic_keywords(title_found)
         
         topic_scores = {}
         
-        for topic, keywords in self.system_design_topics.items():
-            # Count keyword matches
-            matches = sum(1 for keyword in keywords if keyword in full_text)
+        for topic in self.system_design_topics:
+            matches = text_matches[topic]
             
-            # Normalize by content length and keyword count
             if matches > 0:
                 # Weight title matches more heavily
-                title_matches = sum(1 for keyword in keywords if keyword in title.lower())
-                weighted_score = matches + (title_matches * 2)
+                weighted_score = matches + (title_matches[topic] * 2)
                 topic_scores[topic] = weighted_score
         
         return topic_scores
@@ -141,44 +305,12 @@ class ContentCategorizer:
         Returns:
             Dictionary with topic scores
         """
-        # Topic descriptions for TF-IDF comparison
-        topic_descriptions = {
-            "distributed_systems": "microservices architecture distributed systems scalability load balancing consistency availability partition tolerance service mesh API gateway",
-            "databases": "database design SQL NoSQL sharding replication indexing query optimization ACID transactions data modeling consistency",
-            "caching": "cache strategies Redis Memcached CDN cache invalidation performance optimization distributed cache TTL",
-            "messaging": "message queues Kafka RabbitMQ pub/sub event streaming asynchronous communication producer consumer",
-            "monitoring": "monitoring logging metrics tracing observability APM alerting performance distributed tracing health checks",
-            "security": "authentication authorization OAuth JWT encryption security vulnerabilities access control RBAC zero trust",
-            "deployment": "CI/CD Docker Kubernetes containerization orchestration DevOps infrastructure automation blue green canary",
-            "scalability": "scalability performance throughput latency auto scaling load testing capacity planning optimization",
-            "machine_learning": "machine learning ML model training feature engineering data pipeline model serving inference batch processing real-time ML MLOps model deployment A/B testing model versioning data drift model monitoring feature store model registry pipeline orchestration",
-            "ai_llm_systems": "LLM large language model GPT transformer embedding vector database RAG retrieval augmented generation semantic search vector similarity prompt engineering fine-tuning in-context learning AI agent chatbot conversational AI text generation natural language processing NLP tokenization attention mechanism neural network deep learning",
-            "data_engineering": "data pipeline ETL ELT data warehouse data lake data processing batch processing stream processing Apache Spark Apache Flink data ingestion data transformation data quality data governance data lineage data catalog schema evolution data partitioning"
-        }
-        
-        # Prepare documents for TF-IDF
-        documents = list(topic_descriptions.values())
-        documents.append(f"{title} {text_content}")
-        
-        # Create TF-IDF vectors
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            max_features=1000,
-            ngram_range=(1, 2)  # Include bigrams
-        )
-        
         try:
-            tfidf_matrix = vectorizer.fit_transform(documents)
-            
-            # Calculate similarity between content and each topic
-            content_vector = tfidf_matrix[-1]  # Last vector is our content
-            topic_vectors = tfidf_matrix[:-1]   # All others are topics
-            
-            similarities = cosine_similarity(content_vector, topic_vectors)[0]
+            # Only the content needs transforming; topic vectors are cached at init
+            similarities = self._tfidf_scores([title.lower()], [text_content.lower()])[0]
             
             # Create topic scores dictionary
-            topic_names = list(topic_descriptions.keys())
-            topic_scores = dict(zip(topic_names, similarities))
+            topic_scores = dict(zip(self.topic_names, similarities))
             
             return topic_scores
             
@@ -186,44 +318,260 @@ class ContentCategorizer:
             print(f"Error in TF-IDF categorization: {e}")
             return {}
     
-    def categorize_hybrid(self, text_content: str, title: str = "", company: str = "") -> Dict[str, float]:
+    def categorize_by_tfidf_batch(self, texts: List[str]) -> np.ndarray:
         """
-        Combine multiple approaches for best categorization results.
+        Categorize many documents with a single TF-IDF transform.
         
         Args:
-            text_content: The main content of the blog post
-            title: The title of the blog post
-            company: The company that published the blog
+            texts: Documents to score (title and content joined)
             
         Returns:
-            Dictionary with normalized topic scores
+            Array of shape (len(texts), n_topics) with similarity scores,
+            columns ordered as self.topic_names
         """
-        # Get scores from different methods
-        keyword_scores = self.categorize_by_keywords(text_content, title)
-        tfidf_scores = self.categorize_by_tfidf(text_content, title)
+        return self._tfidf_scores([""] * len(texts), [text.lower() for text in texts])
+    
+    def _tfidf_scores(self, titles_lower: List[str], contents_lower: List[str]) -> np.ndarray:
+        """
+        TF-IDF similarity matrix for lowercased titles and contents.
+        
+        Each document is scored as "title content" without building that string.
         
-        # Combine scores with weights
-        final_scores = {}
+        Args:
+            titles_lower: Lowercased title of each document
+            contents_lower: Lowercased content of each document
+            
+        Returns:
+            Array of shape (len(contents_lower), n_topics) with similarity scores
+        """
+        try:
+            counts = np.zeros((len(contents_lower), len(self._vocabulary)), dtype=np.float32)
+            for i, (title, content) in enumerate(zip(titles_lower, contents_lower)):
+                counts[i] = np.bincount(np.asarray(self._term_ids(title, content), dtype=np.intp),
+                                        minlength=len(self._vocabulary))
+            
+            # TF-IDF weighting and L2 normalization, matching the fitted vectorizer
+            counts *= self._idf
+            norms = np.linalg.norm(counts, axis=1, keepdims=True)
+            counts /= np.where(norms > 0, norms, 1.0)
+            return counts @ self._topic_vectors
+        except Exception as e:
+            print(f"Error in TF-IDF categorization: {e}")
+            return np.zeros((len(contents_lower), len(self.topic_names)), dtype=np.float32)
+    
+    def _term_ids(self, title_lower: str, content_lower: str) -> List[int]:
+        """
+        Vocabulary ids of the unigrams and bigrams in a lowercased title + content.
         
-        for topic in self.system_design_topics.keys():
-            keyword_score = keyword_scores.get(topic, 0)
-            tfidf_score = tfidf_scores.get(topic, 0)
+        Mirrors the fitted TfidfVectorizer analyzer: tokenize, drop English stop
+        words, then form bigrams from the remaining tokens. Terms outside the
+        topic vocabulary are skipped.
+        
+        Args:
+            title_lower: Lowercased title
+            content_lower: Lowercased content
+            
+        Returns:
+            List of vocabulary ids, one per term occurrence
+        """
+        vocabulary = self._vocabulary
+        stop_words = self._stop_words
+        # Joining the token lists (not the strings) keeps the title/content bigram
+        tokens = [token for text in (title_lower, content_lower)
+                  for token in self._token_pattern.findall(text)
+                  if token not in stop_words]
+        
+        term_ids = [vocabulary[token] for token in tokens if token in vocabulary]
+        bigram_heads = self._bigram_heads
+        for first, second in zip(tokens, tokens[1:]):
+            if first in bigram_heads:
+                term_id = vocabulary.get(f"{first} {second}")
+                if term_id is not None:
+                    term_ids.append(term_id)
+        return term_ids
+    
+    def categorize_hybrid_batch(self, text_contents: List[str], titles: List[str],
+                                companies: List[str], out: np.ndarray = None, n_jobs: int = 1,
+                                on_progress: Callable[[int], None] = None) -> np.ndarray:
+        """
+        Combine keyword and TF-IDF scores for many blogs at once.
+        
+        Duplicate and previously scored blogs are taken from the score cache;
+        only distinct uncached blogs are scored, in contiguous slices, and
+        their rows are added to the cache before company weights are applied.
+        
+        Args:
+            text_contents: Main content of each blog post
+            titles: Title of each blog post
+            companies: Company that published each blog
+            out: Optional preallocated float32 array of shape (n_blogs, n_topics)
+                 to write the scores into
+            n_jobs: Number of worker processes used to score slices (-1 uses all
+                    cores, -2 all but one, 1 scores in-process); fewer than
+                    PARALLEL_MIN_BLOGS uncached blogs are always scored in-process
+            on_progress: Optional callback receiving the number of blogs finished,
+                         called as slices complete
             
-            # Weighted combination (adjust weights based on testing)
-            combined_score = (keyword_score * 0.4) + (tfidf_score * 0.6)
+        Returns:
+            Array of shape (n_blogs, n_topics) with scores normalized to 0-1 per
+            row, columns ordered as self.topic_names
+        """
+        if n_jobs == 0:
+            raise ValueError("n_jobs must be a non-zero integer")
+        # Negative values count back from the number of cores, as in joblib (-2 = all but one)
+        n_workers = n_jobs if n_jobs > 0 else max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+        
+        keys, rows, missing = self._lookup_scores(text_contents, titles)
+        todo = list(missing.values())
+        if on_progress:
+            on_progress(len(keys) - len(todo))
+        
+        # Most of the scoring time goes to the pure-Python tokenizer (_term_ids) and
+        # keyword bookkeeping, which hold the GIL, so slices go to worker processes
+        # rather than threads. Each task gets this categorizer (without its score
+        # cache, see __getstate__) and one slice.
+        scores = np.empty((len(todo), len(self.topic_names)), dtype=np.float32)
+        starts = range(0, len(todo), CATEGORIZE_SLICE_SIZE)
+        slices = [todo[start:start + CATEGORIZE_SLICE_SIZE] for start in starts]
+        
+        if n_workers > 1 and len(slices) > 1 and len(todo) >= PARALLEL_MIN_BLOGS:
+            # Results are yielded in order as the tasks finish
+            slice_scores = Parallel(n_jobs=n_workers, return_as="generator")(
+                delayed(_categorize_chunk)(self, [text_contents[i] for i in indices],
+                                           [titles[i] for i in indices])
+                for indices in slices
+            )
+            for start, chunk_scores in zip(starts, slice_scores):
+                scores[start:start + len(chunk_scores)] = chunk_scores
+                if on_progress:
+                    on_progress(len(chunk_scores))
+        else:
+            # In-process slices write straight into the preallocated matrix
+            for start, indices in zip(starts, slices):
+                self._score_blogs([text_contents[i] for i in indices], [titles[i] for i in indices],
+                                  out=scores[start:start + len(indices)])
+                if on_progress:
+                    on_progress(len(indices))
+        
+        # Warm the cache, then scatter the rows back to every blog
+        self._store_scores(rows, list(missing), scores)
+        return self._weighted_scores(keys, rows, companies, out=out)
+    
+    def _lookup_scores(self, text_contents: List[str],
+                       titles: List[str]) -> Tuple[List[tuple], Dict[tuple, np.ndarray], Dict[tuple, int]]:
+        """
+        Split blogs into cached score rows and distinct blogs still to score.
+        
+        Args:
+            text_contents: Main content of each blog post
+            titles: Title of each blog post
             
-            # Apply company-specific weights
-            if company in self.company_weights and topic in self.company_weights[company]:
-                combined_score *= self.company_weights[company][topic]
+        Returns:
+            (cache key per blog, cached rows by key, index of the first blog
+            with each uncached key). Rows are collected locally so cache
+            eviction cannot drop one before it is used.
+        """
+        keys = [(title, _content_hash(text_content)) for text_content, title in zip(text_contents, titles)]
+        rows = {}
+        missing = {}
+        for i, key in enumerate(keys):
+            if key in rows or key in missing:
+                continue
+            cached = self._score_cache.get(key)
+            if cached is not None:
+                rows[key] = cached
+            else:
+                missing[key] = i
+        return keys, rows, missing
+    
+    def _store_scores(self, rows: Dict[tuple, np.ndarray], keys: List[tuple], scores: np.ndarray) -> None:
+        """
+        Add freshly scored rows to the batch's rows and to the score cache.
+        
+        Args:
+            rows: Score rows by key for the current batch (updated in place)
+            keys: Cache key of each row of scores
+            scores: Unweighted score rows, one per key
+        """
+        for key, row in zip(keys, scores):
+            rows[key] = row
+            if len(self._score_cache) >= SCORE_CACHE_SIZE:
+                del self._score_cache[next(iter(self._score_cache))]
+            self._score_cache[key] = row
+    
+    def _score_blogs(self, text_contents: List[str], titles: List[str],
+                     out: np.ndarray = None) -> np.ndarray:
+        """
+        Keyword + TF-IDF scores before company weights, without the cache.
+        
+        Args:
+            text_contents: Main content of each blog post
+            titles: Title of each blog post
+            out: Optional float32 array of shape (n_blogs, n_topics) to write into
             
-            final_scores[topic] = combined_score
+        Returns:
+            Array of shape (n_blogs, n_topics) with unnormalized scores
+        """
+        # Lowercase each title and content once and share them between both methods
+        titles_lower = [title.lower() for title in titles]
+        contents_lower = [text_content.lower() for text_content in text_contents]
         
-        # Normalize scores to 0-1 range
-        max_score = max(final_scores.values()) if final_scores.values() else 0
-        if max_score > 0:
-            final_scores = {k: v/max_score for k, v in final_scores.items()}
+        # Get scores from different methods
+        tfidf_scores = self._tfidf_scores(titles_lower, contents_lower)
+        
+        keyword_scores = np.zeros_like(tfidf_scores)
+        for row, (content_lower, title_lower) in enumerate(zip(contents_lower, titles_lower)):
+            for topic, score in self._score_keywords(content_lower, title_lower).items():
+                keyword_scores[row, self._topic_index[topic]] = score
+        
+        # Weighted combination (adjust weights based on testing)
+        combined = out if out is not None else np.empty_like(tfidf_scores)
+        np.multiply(keyword_scores, 0.4, out=combined)
+        combined += tfidf_scores * 0.6
+        return combined
+    
+    def _weighted_scores(self, keys: List[tuple], rows: Dict[tuple, np.ndarray],
+                         companies: List[str], out: np.ndarray = None) -> np.ndarray:
+        """
+        Gather each blog's score row, apply company weights and normalize per row.
+        
+        Args:
+            keys: Cache key of each blog
+            rows: Unweighted score row for every key
+            companies: Company that published each blog
+            out: Optional float32 array of shape (n_blogs, n_topics) to write into
+            
+        Returns:
+            Array of shape (n_blogs, n_topics) with scores normalized to 0-1 per row
+        """
+        combined = out if out is not None else np.empty((len(keys), len(self.topic_names)), dtype=np.float32)
+        for i, key in enumerate(keys):
+            combined[i] = rows[key]
+        
+        # Apply company-specific weights
+        unknown_company = len(self._company_index)
+        company_ids = [self._company_index.get(company, unknown_company) for company in companies]
+        combined *= self._weight_matrix[company_ids]
+        
+        # Normalize scores to 0-1 range in place
+        row_max = combined.max(axis=1, keepdims=True)
+        np.divide(combined, np.where(row_max > 0, row_max, 1.0), out=combined)
+        return combined
+    
+    def categorize_hybrid(self, text_content: str, title: str = "", company: str = "") -> Dict[str, float]:
+        """
+        Combine multiple approaches for best categorization results.
         
-        return final_scores
+        Args:
+            text_content: The main content of the blog post
+            title: The title of the blog post
+            company: The company that published the blog
+            
+        Returns:
+            Dictionary with normalized topic scores
+        """
+        scores = self.categorize_hybrid_batch([text_content], [title], [company])[0]
+        return dict(zip(self.topic_names, scores.tolist()))
     
     def get_primary_topic(self, topic_scores: Dict[str, float], threshold: float = 0.1) -> str:
         """
@@ -262,7 +610,40 @@ class ContentCategorizer:
         if not topic_scores:
             return []
         
-        return sorted(topic_scores.items(), key=lambda x: x[1], reverse=True)[:n]
+        return heapq.nlargest(n, topic_scores.items(), key=lambda x: x[1])
+    
+    def get_primary_topic_batch(self, score_matrix: np.ndarray, threshold: float = 0.1) -> List[str]:
+        """
+        Get the primary topic for every row of a score matrix.
+        
+        Args:
+            score_matrix: Array of shape (n_blogs, n_topics), columns ordered as self.topic_names
+            threshold: Minimum score to consider a topic relevant
+            
+        Returns:
+            Primary topic name per row ("general" when no topic reaches the threshold)
+        """
+        best = score_matrix.argmax(axis=1)
+        best_scores = score_matrix[np.arange(len(score_matrix)), best]
+        return [self.topic_names[idx] if score >= threshold else "general"
+                for idx, score in zip(best.tolist(), best_scores.tolist())]
+    
+    def get_top_topics_batch(self, score_matrix: np.ndarray, n: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        Get the top N topics for every row of a score matrix.
+        
+        Args:
+            score_matrix: Array of shape (n_blogs, n_topics), columns ordered as self.topic_names
+            n: Number of top topics to return per row
+            
+        Returns:
+            List of (topic, score) tuples per row, sorted by score
+        """
+        # Stable sort keeps ties in topic order, matching get_top_topics
+        top_idx = np.argsort(-score_matrix, axis=1, kind='stable')[:, :n]
+        top_scores = np.take_along_axis(score_matrix, top_idx, axis=1)
+        return [[(self.topic_names[idx], score) for idx, score in zip(row_idx, row_scores)]
+                for row_idx, row_scores in zip(top_idx.tolist(), top_scores.tolist())]
 
 
 class BlogContentProcessor:
@@ -279,6 +660,31 @@ class BlogContentProcessor:
         """
         self.db_path = db_path
         self.categorizer = ContentCategorizer()
+        self._conn = None
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Return the processor's shared SQLite connection, opening it on first use.
+        
+        The connection is tuned once (WAL journal with NORMAL sync, larger page
+        cache, memory-mapped reads, in-memory temp tables) and reused by every method.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA cache_size=-65536;
+                PRAGMA mmap_size=268435456;
+                PRAGMA temp_store=MEMORY;
+            """)
+        return self._conn
+    
+    def close(self) -> None:
+        """Close the shared SQLite connection if it is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
     
     def extract_blog_content(self) -> List[Dict]:
         """
@@ -287,48 +693,60 @@ class BlogContentProcessor:
         Returns:
             List of blog dictionaries with content
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
-        # Get all blog content with sufficient length
+        # Get all blog content with sufficient length (content_length is indexed for the sort)
         cursor.execute("""
-            SELECT blog_id, title, company, url, text_file_path, content_length, 
+            SELECT blog_id, title, company, url, text_file_path, content_length,
                    extraction_method, extraction_quality
             FROM blog_content 
             WHERE content_length > 500
             ORDER BY content_length DESC
         """)
         
-        blogs = cursor.fetchall()
         blog_data = []
         
-        for blog_id, title, company, url, text_file_path, content_length, extraction_method, extraction_quality in blogs:
-            # Read text content from file
-            if text_file_path and Path(text_file_path).exists():
-                try:
-                    with open(text_file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    blog_data.append({
-                        'blog_id': blog_id,
-                        'title': title,
-                        'company': company,
-                        'url': url,
-                        'content': content,
-                        'content_length': content_length,
-                        'extraction_method': extraction_method,
-                        'extraction_quality': extraction_quality
-                    })
-                except Exception as e:
-                    print(f"Error reading content for {blog_id}: {e}")
-        
-        conn.close()
+        # Stream rows in batches rather than loading the whole result set
+        while True:
+            rows = cursor.fetchmany(256)
+            if not rows:
+                break
+            
+            for row in rows:
+                text_file_path = row['text_file_path']
+                
+                # Read text content from file
+                if text_file_path and Path(text_file_path).exists():
+                    try:
+                        with open(text_file_path, 'r', encoding='utf-8') as f:
+                            content = f.read()
+                        
+                        blog_data.append({
+                            'blog_id': row['blog_id'],
+                            'title': row['title'],
+                            'company': row['company'],
+                            'url': row['url'],
+                            'content': content,
+                            'content_length': row['content_length'],
+                            'extraction_method': row['extraction_method'],
+                            'extraction_quality': row['extraction_quality']
+                        })
+                    except Exception as e:
+                        print(f"Error reading content for {row['blog_id']}: {e}")
+        
         return blog_data
     
-    def categorize_all_blogs(self) -> List[Dict]:
+    def categorize_all_blogs(self, n_jobs: int = -1) -> List[Dict]:
         """
         Categorize all blog content.
         
+        Args:
+            n_jobs: Number of worker processes used to score blog slices
+                    (-1 uses all cores, -2 all but one, 1 scores every slice in-process);
+                    fewer than PARALLEL_MIN_BLOGS blogs are always scored in-process
+        
         Returns:
             List of categorized blog dictionaries
         """
@@ -337,25 +755,27 @@ class BlogContentProcessor:
         
         print(f"📊 Processing {len(blog_data)} blogs for categorization...")
         
-        for i, blog in enumerate(blog_data):
-            print(f"Processing {i+1}/{len(blog_data)}: {blog['title'][:50]}...")
-            
-            # Categorize content
-            topic_scores = self.categorizer.categorize_hybrid(
-                blog['content'], 
-                blog['title'], 
-                blog['company']
+        with tqdm(total=len(blog_data), desc="Categorizing", unit="blog", mininterval=0.2) as progress:
+            score_matrix = self.categorizer.categorize_hybrid_batch(
+                [blog['content'] for blog in blog_data],
+                [blog['title'] for blog in blog_data],
+                [blog['company'] for blog in blog_data],
+                n_jobs=n_jobs,
+                on_progress=progress.update
             )
-            
-            # Get primary topic and top topics
-            primary_topic = self.categorizer.get_primary_topic(topic_scores)
-            top_topics = self.categorizer.get_top_topics(topic_scores, 3)
-            
+        
+        # Get primary topic and top topics for all blogs at once
+        primary_topics = self.categorizer.get_primary_topic_batch(score_matrix)
+        top_topics_list = self.categorizer.get_top_topics_batch(score_matrix, 3)
+        
+        # The matrix stays internal; each blog gets its own {topic: score} dict
+        topic_names = self.categorizer.topic_names
+        for i, (blog, scores) in enumerate(zip(blog_data, score_matrix.tolist())):
             categorized_blog = {
                 **blog,
-                'primary_topic': primary_topic,
-                'topic_scores': topic_scores,
-                'top_topics': top_topics
+                'primary_topic': primary_topics[i],
+                'topic_scores': dict(zip(topic_names, scores)),
+                'top_topics': top_topics_list[i]
             }
             
             categorized_blogs.append(categorized_blog)
@@ -369,7 +789,7 @@ class BlogContentProcessor:
         Args:
             categorized_blogs: List of categorized blog dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         # Create topics table if not exists
@@ -379,25 +799,50 @@ class BlogContentProcessor:
                 primary_topic TEXT,
                 topic_scores TEXT,
                 top_topics TEXT,
+                company TEXT,
                 FOREIGN KEY (blog_id) REFERENCES blog_content (blog_id)
             )
         """)
         
-        # Insert categorized data
-        for blog in categorized_blogs:
+        # Company is stored alongside the topic so analysis needs no join;
+        # tables created before that get the column added
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(blog_topics)")}
+        if 'company' not in columns:
+            cursor.execute("ALTER TABLE blog_topics ADD COLUMN company TEXT")
+            # Existing rows would otherwise drop out of the company report
             cursor.execute("""
-                INSERT OR REPLACE INTO blog_topics 
-                (blog_id, primary_topic, topic_scores, top_topics)
-                VALUES (?, ?, ?, ?)
-            """, (
+                UPDATE blog_topics
+                SET company = (SELECT company FROM blog_content
+                               WHERE blog_content.blog_id = blog_topics.blog_id)
+                WHERE company IS NULL
+            """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_blog_topics_topic_company
+            ON blog_topics(primary_topic, company)
+        """)
+        
+        # Insert categorized data in one batch. Scores are stored to 4 decimals and
+        # near-zero topics are dropped; compact separators keep rows small.
+        rows = (
+            (
                 blog['blog_id'],
                 blog['primary_topic'],
-                json.dumps(blog['topic_scores']),
-                json.dumps(blog['top_topics'])
-            ))
+                json.dumps({topic: round(float(score), 4)
+                            for topic, score in blog['topic_scores'].items() if score >= 0.01},
+                           separators=(',', ':')),
+                json.dumps([(topic, round(float(score), 4)) for topic, score in blog['top_topics']],
+                           separators=(',', ':')),
+                blog.get('company')
+            )
+            for blog in categorized_blogs
+        )
+        cursor.executemany("""
+            INSERT OR REPLACE INTO blog_topics 
+            (blog_id, primary_topic, topic_scores, top_topics, company)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
         
         conn.commit()
-        conn.close()
         
         print(f"✅ Saved categorization for {len(categorized_blogs)} blogs")
     
@@ -405,7 +850,7 @@ class BlogContentProcessor:
         """
         Analyze and display categorization results.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         # Get topic distribution
@@ -422,12 +867,11 @@ class BlogContentProcessor:
         for topic, count in topic_distribution:
             print(f"  {topic}: {count} blogs")
         
-        # Get company-specific topics
+        # Get company-specific topics (covered by the (primary_topic, company) index)
         cursor.execute("""
-            SELECT bt.primary_topic, bc.company, COUNT(*) as count
-            FROM blog_topics bt
-            JOIN blog_content bc ON bt.blog_id = bc.blog_id
-            GROUP BY bt.primary_topic, bc.company
+            SELECT primary_topic, company, COUNT(*) as count
+            FROM blog_topics
+            GROUP BY primary_topic, company
             ORDER BY count DESC
             LIMIT 20
         """)
@@ -437,8 +881,24 @@ class BlogContentProcessor:
         print("\n🏢 Company-Specific Topics (Top 20):")
         for topic, company, count in company_topics:
             print(f"  {company} - {topic}: {count} blogs")
+
+
+def _categorize_chunk(categorizer: ContentCategorizer, text_contents: List[str],
+                      titles: List[str]) -> np.ndarray:
+    """
+    Score one slice of blogs in a worker process, before company weights.
+    
+    A module-level function so joblib can pickle the task by reference.
+    
+    Args:
+        categorizer: Fitted categorizer
+        text_contents: Main content of each blog in the slice
+        titles: Title of each blog in the slice
         
-        conn.close()
+    Returns:
+        Score matrix of shape (len(titles), n_topics)
+    """
+    return categorizer._score_blogs(text_contents, titles)
 
 
 def main():
@@ -455,6 +915,7 @@ def main():
     
     # Analyze results
     processor.analyze_categorization_results()
+    processor.close()
     
     print("\n✅ Categorization complete!")
 
@@ -5,13 +5,89 @@ This module implements various chunking strategies optimized for technical blog
 to prepare it for embedding and retrieval in the RAG system.
 """
 
+import os
 import re
 import json
+import logging
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import Counter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Below this many blogs the worker processes' startup and pickling cost
+# outweighs their speedup, so chunking stays in this process
+PARALLEL_MIN_BLOGS = 50
+
+
+def _json_loads(value):
+    """Parse a JSON column, using orjson when it is installed."""
+    return orjson.loads(value) if ORJSON_AVAILABLE else json.loads(value)
+
+
+def _json_dumps(value) -> str:
+    """Serialize a value for a JSON TEXT column, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        # orjson returns bytes; decode so SQLite stores TEXT rather than a BLOB
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# Markdown header lines (H1-H6), found in one pass over the whole document.
+# [^\S\n] is whitespace other than a newline, so surrounding spaces are allowed
+# as with line.strip() without a match running into the next line.
+_HEADER_RE = re.compile(r'^[^\S\n]*#{1,6}[^\S\n]+([^\n]*\S)[^\S\n]*$', re.MULTILINE)
+_NON_SPACE_RE = re.compile(r'\S')
+
+
+def _iter_headers(content: str):
+    """
+    Yield _HEADER_RE matches for the markdown headers in content.
+    
+    Equivalent to _HEADER_RE.finditer(content), but only lines containing a '#'
+    are handed to the regex; the scan between them is a plain str.find, so long
+    header-free stretches of prose are skipped without per-character regex work.
+    """
+    pos = 0
+    while True:
+        hash_pos = content.find('#', pos)
+        if hash_pos == -1:
+            return
+        newline = content.rfind('\n', pos, hash_pos)
+        line_start = newline + 1 if newline != -1 else pos
+        match = _HEADER_RE.match(content, line_start)
+        if match:
+            yield match
+        line_end = content.find('\n', hash_pos)
+        if line_end == -1:
+            return
+        pos = line_end + 1
+
+# Substrings that mark code. '```' is covered by '`', so it is not scanned separately.
+_CODE_INDICATORS = (
+    '`', 'def ', 'class ', 'import ', 'from ',
+    'function(', 'const ', 'var ', 'let ', 'if (', 'for ('
+)
+
+# List item lines ('- ', '* ', '1. ', '2. ', '• ', '◦ ' after leading whitespace).
+# The item must have text after the marker, as a stripped line would.
+_LIST_ITEM_RE = re.compile(r'^[^\S\n]*(?:[-*•◦]|[12]\.) [^\n]*?\S', re.MULTILINE)
 
 
 @dataclass
@@ -40,67 +116,121 @@ class TextChunker:
         self.chunk_size = 512  # Default chunk size in tokens
         self.chunk_overlap = 50  # Overlap between chunks
         self.min_chunk_size = 100  # Minimum chunk size
+        self._blog_cache = {}  # Memoized load_categorized_blogs results, keyed by include_top_topics
+        self._conn = None  # Shared SQLite connection, opened lazily by _get_connection
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Return the chunker's shared SQLite connection, opening it on first use.
+        
+        The connection is tuned once (WAL journal with NORMAL sync, larger page
+        cache, in-memory temp tables) and reused for loading blogs and saving chunks.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-131072;
+            """)
+        return self._conn
+    
+    def close(self) -> None:
+        """Close the shared SQLite connection if it is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def invalidate(self) -> None:
+        """Drop cached blog data so the next load re-reads the database."""
+        self._blog_cache.clear()
     
-    def load_categorized_blogs(self) -> List[Dict]:
-        """Load categorized blog content from database."""
-        conn = sqlite3.connect(self.db_path)
+    def load_categorized_blogs(self, include_top_topics: bool = False) -> List[Dict]:
+        """
+        Load categorized blog content from database.
+        
+        The query, file reads and JSON parsing run once per instance; later
+        calls return the cached list. Call invalidate() to force a reload.
+        
+        Args:
+            include_top_topics: Also load and parse the top_topics JSON column.
+                Chunking only needs topic_scores, so it is skipped by default.
+        """
+        if include_top_topics in self._blog_cache:
+            return self._blog_cache[include_top_topics]
+        
+        conn = self._get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         query = """
         SELECT 
             bc.blog_id, bc.title, bc.company, bc.url, bc.text_file_path, 
-            bc.content_length, bt.primary_topic, bt.topic_scores, bt.top_topics
+            bc.content_length, bt.primary_topic, bt.topic_scores, {top_topics_column} AS top_topics
         FROM blog_content bc
         LEFT JOIN blog_topics bt ON bc.blog_id = bt.blog_id
         WHERE bc.content_length > 500
         ORDER BY bc.content_length DESC
-        """
+        """.format(top_topics_column="bt.top_topics" if include_top_topics else "NULL")
         
         cursor.execute(query)
-        blogs = cursor.fetchall()
-        
-        print(f"🔍 Debug: Found {len(blogs)} blogs in database")
-        if len(blogs) > 0:
-            print(f"🔍 Debug: First blog: {blogs[0][1][:50]}...")  # Show title
         
         blog_data = []
         
-        for blog_id, title, company, url, text_file_path, content_length, primary_topic, topic_scores, top_topics in blogs:
-            print(f"🔍 Debug: Processing {blog_id} - {title[:30]}...")
-            print(f"🔍 Debug: Text file path: {text_file_path}")
-            print(f"🔍 Debug: File exists: {Path(text_file_path).exists() if text_file_path else False}")
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            # Stream rows from the cursor and start each file read as its row
+            # arrives, so disk reads overlap with the query and with each other
+            blogs = []
+            for row in cursor:
+                text_file_path = row['text_file_path']
+                read = None
+                if text_file_path and Path(text_file_path).exists():
+                    read = executor.submit(_read_text, text_file_path)
+                blogs.append((row, read))
             
-            # Read text content from file
-            if text_file_path and Path(text_file_path).exists():
-                try:
-                    with open(text_file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    print(f"🔍 Debug: Content length: {len(content)} chars")
-                    
-                    # Parse JSON fields
-                    topic_scores_dict = json.loads(topic_scores) if topic_scores else {}
-                    top_topics_list = json.loads(top_topics) if top_topics else []
-                    
-                    blog_data.append({
-                        'blog_id': blog_id,
-                        'title': title,
-                        'company': company,
-                        'url': url,
-                        'content': content,
-                        'content_length': content_length,
-                        'primary_topic': primary_topic,
-                        'topic_scores': topic_scores_dict,
-                        'top_topics': top_topics_list
-                    })
-                    
-                    print(f"✅ Added blog {blog_id} to data")
-                except Exception as e:
-                    print(f"❌ Error reading content for {blog_id}: {e}")
-            else:
-                print(f"⚠️ Skipping {blog_id} - file not found or path is None")
+            logger.debug("Found %d blogs in database", len(blogs))
+            if len(blogs) > 0:
+                logger.debug("First blog: %.50s...", blogs[0][0]['title'])  # Show title
+            
+            for row, read in blogs:
+                blog_id = row['blog_id']
+                logger.debug("Processing %s - %.30s...", blog_id, row['title'])
+                logger.debug("Text file path: %s (exists: %s)", row['text_file_path'], read is not None)
+                
+                # Read text content from file
+                if read is not None:
+                    try:
+                        content = read.result()
+                        
+                        logger.debug("Content length: %d chars", len(content))
+                        
+                        # Parse JSON fields
+                        topic_scores = row['topic_scores']
+                        topic_scores_dict = _json_loads(topic_scores) if topic_scores else {}
+                        
+                        blog = {
+                            'blog_id': blog_id,
+                            'title': row['title'],
+                            'company': row['company'],
+                            'url': row['url'],
+                            'content': content,
+                            'content_length': row['content_length'],
+                            'primary_topic': row['primary_topic'],
+                            'topic_scores': topic_scores_dict
+                        }
+                        if include_top_topics:
+                            top_topics = row['top_topics']
+                            blog['top_topics'] = _json_loads(top_topics) if top_topics else []
+                        blog_data.append(blog)
+                        
+                        logger.debug("Added blog %s to data", blog_id)
+                    except Exception as e:
+                        print(f"❌ Error reading content for {blog_id}: {e}")
+                else:
+                    print(f"⚠️ Skipping {blog_id} - file not found or path is None")
         
-        conn.close()
+        self._blog_cache[include_top_topics] = blog_data
         return blog_data
     
     def semantic_chunking(self, content: str, title: str = "") -> List[Dict[str, Any]]:
@@ -121,37 +251,48 @@ class TextChunker:
         
         chunk_index = 0
         for section in sections:
-            if len(section['content'].strip()) < self.min_chunk_size:
+            section_text = content[section['start']:section['end']]
+            if len(section_text.strip()) < self.min_chunk_size:
                 continue
             
             # If section is too large, split it further
-            if len(section['content']) > self.chunk_size * 4:  # 4x chunk size
-                sub_chunks = self._split_large_section(section['content'])
+            if len(section_text) > self.chunk_size * 4:  # 4x chunk size
+                sub_chunks = self._split_large_section(section_text)
+                # Sub-chunks are runs of the section's own text, in order
+                sub_end = section['start']
                 for sub_chunk in sub_chunks:
+                    sub_start = content.find(sub_chunk, sub_end, section['end'])
+                    sub_end = sub_start + len(sub_chunk)
+                    is_code, is_list = self._classify(sub_chunk)
                     chunks.append({
                         'content': sub_chunk,
                         'chunk_type': section['type'],
                         'section_title': section['title'],
                         'chunk_index': chunk_index,
+                        'start_pos': sub_start,
+                        'end_pos': sub_end,
                         'metadata': {
                             'section_type': section['type'],
                             'section_title': section['title'],
-                            'is_code': self._contains_code(sub_chunk),
-                            'is_list': self._is_list_content(sub_chunk)
+                            'is_code': is_code,
+                            'is_list': is_list
                         }
                     })
                     chunk_index += 1
             else:
+                is_code, is_list = self._classify(section_text)
                 chunks.append({
-                    'content': section['content'],
+                    'content': section_text,
                     'chunk_type': section['type'],
                     'section_title': section['title'],
                     'chunk_index': chunk_index,
+                    'start_pos': section['start'],
+                    'end_pos': section['end'],
                     'metadata': {
                         'section_type': section['type'],
                         'section_title': section['title'],
-                        'is_code': self._contains_code(section['content']),
-                        'is_list': self._is_list_content(section['content'])
+                        'is_code': is_code,
+                        'is_list': is_list
                     }
                 })
                 chunk_index += 1
@@ -159,45 +300,29 @@ class TextChunker:
         return chunks
     
     def _split_by_headers(self, content: str) -> List[Dict[str, Any]]:
-        """Split content by headers (H1, H2, H3, etc.)."""
+        """
+        Split content by headers (H1, H2, H3, etc.).
+        
+        Sections are returned as 'start'/'end' offsets into content rather than
+        copies; slice content[start:end] for the section text.
+        """
         sections = []
         
-        # Common header patterns
-        header_patterns = [
-            r'^#{1,6}\s+(.+)$',  # Markdown headers
-            r'^(.+)\n={3,}$',     # Underline headers
-            r'^(.+)\n-{3,}$',     # Underline headers
-            r'^##\s+(.+)$',       # Common blog headers
-            r'^###\s+(.+)$',      # Subsection headers
-        ]
-        
-        lines = content.split('\n')
-        current_section = {'title': '', 'content': '', 'type': 'paragraph'}
-        
-        for line in lines:
-            is_header = False
-            for pattern in header_patterns:
-                match = re.match(pattern, line.strip())
-                if match:
-                    # Save previous section if it has content
-                    if current_section['content'].strip():
-                        sections.append(current_section)
-                    
-                    # Start new section
-                    current_section = {
-                        'title': match.group(1).strip(),
-                        'content': line + '\n',
-                        'type': 'section'
-                    }
-                    is_header = True
-                    break
+        # Each section runs from its header line to the start of the next header
+        section_start, section_title, section_type = 0, '', 'paragraph'
+        for match in _iter_headers(content):
+            # Save previous section if it has content
+            if _NON_SPACE_RE.search(content, section_start, match.start()):
+                sections.append({'title': section_title, 'start': section_start,
+                                 'end': match.start(), 'type': section_type})
             
-            if not is_header:
-                current_section['content'] += line + '\n'
+            # Start new section
+            section_start, section_title, section_type = match.start(), match.group(1).strip(), 'section'
         
         # Add final section
-        if current_section['content'].strip():
-            sections.append(current_section)
+        if _NON_SPACE_RE.search(content, section_start):
+            sections.append({'title': section_title, 'start': section_start,
+                             'end': len(content), 'type': section_type})
         
         return sections
     
@@ -206,35 +331,53 @@ class TextChunker:
         # Split by paragraphs first
         paragraphs = content.split('\n\n')
         chunks = []
-        current_chunk = ""
+        
+        # Collect paragraphs in a list and join once per chunk; current_len tracks
+        # the length of the joined chunk without building it
+        current_paragraphs = []
+        current_len = 0
         
         for paragraph in paragraphs:
-            if len(current_chunk) + len(paragraph) > self.chunk_size:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph
+            if current_len + len(paragraph) > self.chunk_size:
+                current_chunk = '\n\n'.join(current_paragraphs).strip()
+                if current_chunk:
+                    chunks.append(current_chunk)
+                current_paragraphs = [paragraph]
+                current_len = len(paragraph)
+            elif current_len:
+                current_paragraphs.append(paragraph)
+                current_len += 2 + len(paragraph)
             else:
-                current_chunk += '\n\n' + paragraph if current_chunk else paragraph
+                current_paragraphs = [paragraph]
+                current_len = len(paragraph)
         
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        current_chunk = '\n\n'.join(current_paragraphs).strip()
+        if current_chunk:
+            chunks.append(current_chunk)
         
         return chunks
     
+    def _classify(self, text: str) -> Tuple[bool, bool]:
+        """
+        Classify chunk text for metadata.
+        
+        Args:
+            text: Chunk text
+            
+        Returns:
+            Tuple of (is_code, is_list)
+        """
+        return self._contains_code(text), self._is_list_content(text)
+    
     def _contains_code(self, text: str) -> bool:
         """Check if text contains code blocks."""
-        code_indicators = [
-            '```', '`', 'def ', 'class ', 'import ', 'from ',
-            'function(', 'const ', 'var ', 'let ', 'if (', 'for ('
-        ]
-        return any(indicator in text for indicator in code_indicators)
+        return any(indicator in text for indicator in _CODE_INDICATORS)
     
     def _is_list_content(self, text: str) -> bool:
         """Check if text is list content."""
-        lines = text.strip().split('\n')
-        list_indicators = ['- ', '* ', '1. ', '2. ', '• ', '◦ ']
-        list_lines = sum(1 for line in lines if any(line.strip().startswith(indicator) for indicator in list_indicators))
-        return list_lines > len(lines) * 0.3  # 30% of lines are list items
+        line_count = text.strip().count('\n') + 1
+        list_lines = sum(1 for _ in _LIST_ITEM_RE.finditer(text))
+        return list_lines > line_count * 0.3  # 30% of lines are list items
     
     def fixed_size_chunking(self, content: str, chunk_size: int = None) -> List[Dict[str, Any]]:
         """
@@ -265,22 +408,22 @@ class TextChunker:
             # Find a good break point (end of sentence or paragraph)
             if end < len(content):
                 # Look for sentence endings within reasonable range
+                # (positions search_start + 1 through end, scanned from the right)
                 search_start = max(start + chunk_size * 2, end - 200)
-                for i in range(end, search_start, -1):
-                    if content[i] in '.!?':
-                        end = i + 1
-                        break
+                sentence_end = max(content.rfind(mark, search_start + 1, end + 1) for mark in '.!?')
+                if sentence_end >= 0:
+                    end = sentence_end + 1
                 else:
                     # Look for paragraph breaks
                     search_start = max(start + chunk_size, end - 100)
-                    for i in range(end, search_start, -1):
-                        if content[i] == '\n':
-                            end = i
-                            break
+                    paragraph_end = content.rfind('\n', search_start + 1, end + 1)
+                    if paragraph_end >= 0:
+                        end = paragraph_end
             
             chunk_text = content[start:end].strip()
             
             if len(chunk_text) >= self.min_chunk_size:
+                is_code, is_list = self._classify(chunk_text)
                 chunks.append({
                     'content': chunk_text,
                     'chunk_type': 'fixed_size',
@@ -289,8 +432,8 @@ class TextChunker:
                     'end_pos': end,
                     'metadata': {
                         'chunk_size': len(chunk_text),
-                        'is_code': self._contains_code(chunk_text),
-                        'is_list': self._is_list_content(chunk_text)
+                        'is_code': is_code,
+                        'is_list': is_list
                     }
                 })
                 chunk_index += 1
@@ -326,6 +469,8 @@ class TextChunker:
                 'content': content,
                 'chunk_type': 'full_blog',
                 'chunk_index': 0,
+                'start_pos': 0,
+                'end_pos': len(content),
                 'metadata': {
                     'level': 1,
                     'title': title,
@@ -334,40 +479,57 @@ class TextChunker:
             })
             return chunks
         
-        # Level 2: Sections
+        # Level 2: Sections, and Level 3: Paragraphs (for large sections), in one
+        # pass; paragraph chunks are kept separately so they still follow all sections
         sections = self._split_by_headers(content)
+        paragraph_chunks = []
         for i, section in enumerate(sections):
-            if len(section['content'].strip()) < self.min_chunk_size:
-                continue
+            section_start, section_end = section['start'], section['end']
             
-            chunks.append({
-                'content': section['content'],
-                'chunk_type': 'section',
-                'chunk_index': i,
-                'metadata': {
-                    'level': 2,
-                    'section_title': section['title'],
-                    'section_type': section['type']
-                }
-            })
-        
-        # Level 3: Paragraphs (for large sections)
-        for i, section in enumerate(sections):
-            if len(section['content']) > self.chunk_size:
-                paragraphs = section['content'].split('\n\n')
-                for j, paragraph in enumerate(paragraphs):
-                    if len(paragraph.strip()) >= self.min_chunk_size:
-                        chunks.append({
-                            'content': paragraph,
-                            'chunk_type': 'paragraph',
-                            'chunk_index': f"{i}_{j}",
-                            'metadata': {
-                                'level': 3,
-                                'section_title': section['title'],
-                                'paragraph_index': j
-                            }
-                        })
+            if section_end - section_start >= self.min_chunk_size:
+                section_text = content[section_start:section_end]
+                if len(section_text.strip()) >= self.min_chunk_size:
+                    chunks.append({
+                        'content': section_text,
+                        'chunk_type': 'section',
+                        'chunk_index': i,
+                        'start_pos': section_start,
+                        'end_pos': section_end,
+                        'metadata': {
+                            'level': 2,
+                            'section_title': section['title'],
+                            'section_type': section['type']
+                        }
+                    })
+            
+            if section_end - section_start > self.chunk_size:
+                # Walk the '\n\n'-separated paragraphs by offset within the section
+                paragraph_start = section_start
+                j = 0
+                while True:
+                    separator = content.find('\n\n', paragraph_start, section_end)
+                    paragraph_end = section_end if separator == -1 else separator
+                    if paragraph_end - paragraph_start >= self.min_chunk_size:
+                        paragraph = content[paragraph_start:paragraph_end]
+                        if len(paragraph.strip()) >= self.min_chunk_size:
+                            paragraph_chunks.append({
+                                'content': paragraph,
+                                'chunk_type': 'paragraph',
+                                'chunk_index': f"{i}_{j}",
+                                'start_pos': paragraph_start,
+                                'end_pos': paragraph_end,
+                                'metadata': {
+                                    'level': 3,
+                                    'section_title': section['title'],
+                                    'paragraph_index': j
+                                }
+                            })
+                    if separator == -1:
+                        break
+                    paragraph_start = separator + 2
+                    j += 1
         
+        chunks.extend(paragraph_chunks)
         return chunks
     
     def chunk_blog(self, blog_data: Dict[str, Any], strategy: str = "semantic") -> List[TextChunk]:
@@ -405,8 +567,8 @@ class TextChunker:
                 content=chunk_data['content'],
                 chunk_type=chunk_data['chunk_type'],
                 chunk_index=i,
-                start_pos=0,  # Simplified for now
-                end_pos=len(chunk_data['content']),
+                start_pos=chunk_data.get('start_pos', 0),
+                end_pos=chunk_data.get('end_pos', len(chunk_data['content'])),
                 metadata=chunk_data.get('metadata', {}),
                 topic_scores=blog_data.get('topic_scores', {}),
                 primary_topic=blog_data.get('primary_topic', 'general')
@@ -416,13 +578,33 @@ class TextChunker:
         
         return text_chunks
     
-    def chunk_all_blogs(self, strategy: str = "semantic", limit: int = None) -> List[TextChunk]:
+    def _chunk_blog_or_error(self, blog_data: Dict[str, Any], strategy: str) -> Tuple[List[TextChunk], Optional[str]]:
+        """
+        Chunk a single blog, returning the error message instead of raising.
+        
+        Args:
+            blog_data: Blog data dictionary
+            strategy: Chunking strategy
+            
+        Returns:
+            Tuple of (chunks, error message or None)
+        """
+        try:
+            return self.chunk_blog(blog_data, strategy), None
+        except Exception as e:
+            return [], str(e)
+    
+    def chunk_all_blogs(self, strategy: str = "semantic", limit: int = None,
+                        max_workers: Optional[int] = None) -> List[TextChunk]:
         """
         Chunk all blogs using the specified strategy.
         
         Args:
             strategy: Chunking strategy
             limit: Limit number of blogs to process
+            max_workers: Number of worker processes (None uses all cores,
+                         1 chunks every blog in this process); fewer than
+                         PARALLEL_MIN_BLOGS blogs are always chunked in-process
             
         Returns:
             List of all TextChunk objects
@@ -436,16 +618,32 @@ class TextChunker:
         
         print(f"📊 Chunking {len(blog_data)} blogs using {strategy} strategy...")
         
-        for i, blog in enumerate(blog_data):
-            print(f"Processing {i+1}/{len(blog_data)}: {blog['title'][:50]}...")
+        # Blogs are independent, so chunk them across processes; each worker
+        # builds its own chunker with this instance's settings
+        n_workers = max_workers or os.cpu_count() or 1
+        if n_workers == 1 or len(blog_data) < PARALLEL_MIN_BLOGS:
+            results = [self._chunk_blog_or_error(blog, strategy) for blog in blog_data]
+        else:
+            # About four tasks per worker balances uneven blog sizes against
+            # per-task pickling overhead
+            chunksize = max(1, len(blog_data) // (n_workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_chunk_worker,
+                initargs=(self.db_path, self.chunk_size, self.chunk_overlap, self.min_chunk_size)
+            ) as executor:
+                results = list(executor.map(partial(_chunk_blog_in_worker, strategy=strategy),
+                                            blog_data, chunksize=chunksize))
+        
+        for i, (blog, (chunks, error)) in enumerate(zip(blog_data, results)):
+            logger.debug("Processing %d/%d: %.50s...", i + 1, len(blog_data), blog['title'])
             
-            try:
-                chunks = self.chunk_blog(blog, strategy)
+            if error is None:
                 all_chunks.extend(chunks)
                 
-                print(f"  Created {len(chunks)} chunks")
-            except Exception as e:
-                print(f"  Error chunking blog {blog['blog_id']}: {e}")
+                logger.debug("Created %d chunks", len(chunks))
+            else:
+                print(f"  Error chunking blog {blog['blog_id']}: {error}")
         
         print(f"✅ Total chunks created: {len(all_chunks)}")
         return all_chunks
@@ -457,7 +655,7 @@ class TextChunker:
         Args:
             chunks: List of TextChunk objects
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         # Create chunks table if not exists
@@ -477,14 +675,9 @@ class TextChunker:
             )
         """)
         
-        # Insert chunks
-        for chunk in chunks:
-            cursor.execute("""
-                INSERT OR REPLACE INTO blog_chunks 
-                (chunk_id, blog_id, content, chunk_type, chunk_index, 
-                 start_pos, end_pos, metadata, topic_scores, primary_topic)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        # Insert chunks in one batch and one transaction
+        rows = (
+            (
                 chunk.chunk_id,
                 chunk.blog_id,
                 chunk.content,
@@ -492,13 +685,20 @@ class TextChunker:
                 chunk.chunk_index,
                 chunk.start_pos,
                 chunk.end_pos,
-                json.dumps(chunk.metadata),
-                json.dumps(chunk.topic_scores),
+                _json_dumps(chunk.metadata),
+                _json_dumps(chunk.topic_scores),
                 chunk.primary_topic
-            ))
+            )
+            for chunk in chunks
+        )
+        cursor.executemany("""
+            INSERT OR REPLACE INTO blog_chunks 
+            (chunk_id, blog_id, content, chunk_type, chunk_index, 
+             start_pos, end_pos, metadata, topic_scores, primary_topic)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
         
         conn.commit()
-        conn.close()
         
         print(f"✅ Saved {len(chunks)} chunks to database")
     
@@ -516,41 +716,47 @@ class TextChunker:
         print("\n📊 Chunk Analysis")
         print("=" * 50)
         
-        # Basic statistics
+        # Gather all statistics in a single pass over the chunks
         total_chunks = len(chunks)
-        avg_length = sum(len(chunk.content) for chunk in chunks) / total_chunks
+        total_length = 0
+        min_length = max_length = len(chunks[0].content)
+        chunk_types = Counter()
+        topics = Counter()
+        blogs = Counter()
+        
+        for chunk in chunks:
+            length = len(chunk.content)
+            total_length += length
+            if length < min_length:
+                min_length = length
+            elif length > max_length:
+                max_length = length
+            chunk_types[chunk.chunk_type] += 1
+            topics[chunk.primary_topic] += 1
+            blogs[chunk.blog_id] += 1
+        
+        # Basic statistics
+        avg_length = total_length / total_chunks
         
         print(f"📈 Basic Statistics:")
         print(f"  Total chunks: {total_chunks}")
         print(f"  Average length: {avg_length:.0f} characters")
-        print(f"  Min length: {min(len(chunk.content) for chunk in chunks)}")
-        print(f"  Max length: {max(len(chunk.content) for chunk in chunks)}")
+        print(f"  Min length: {min_length}")
+        print(f"  Max length: {max_length}")
         
         # Chunk type distribution
-        chunk_types = defaultdict(int)
-        for chunk in chunks:
-            chunk_types[chunk.chunk_type] += 1
-        
         print(f"\n📋 Chunk Type Distribution:")
-        for chunk_type, count in sorted(chunk_types.items(), key=lambda x: x[1], reverse=True):
+        for chunk_type, count in chunk_types.most_common():
             percentage = (count / total_chunks) * 100
             print(f"  {chunk_type}: {count} chunks ({percentage:.1f}%)")
         
         # Topic distribution
-        topics = defaultdict(int)
-        for chunk in chunks:
-            topics[chunk.primary_topic] += 1
-        
         print(f"\n🎯 Topic Distribution:")
-        for topic, count in sorted(topics.items(), key=lambda x: x[1], reverse=True):
+        for topic, count in topics.most_common():
             percentage = (count / total_chunks) * 100
             print(f"  {topic}: {count} chunks ({percentage:.1f}%)")
         
         # Blog distribution
-        blogs = defaultdict(int)
-        for chunk in chunks:
-            blogs[chunk.blog_id] += 1
-        
         print(f"\n📝 Blog Distribution:")
         print(f"  Total blogs: {len(blogs)}")
         print(f"  Average chunks per blog: {total_chunks / len(blogs):.1f}")
@@ -558,6 +764,24 @@ class TextChunker:
         print(f"  Max chunks per blog: {max(blogs.values())}")
 
 
+# Per-process chunker used by chunk_all_blogs worker processes
+_worker_chunker = None
+
+
+def _init_chunk_worker(db_path: str, chunk_size: int, chunk_overlap: int, min_chunk_size: int) -> None:
+    """Create the worker process's chunker with the parent's settings."""
+    global _worker_chunker
+    _worker_chunker = TextChunker(db_path)
+    _worker_chunker.chunk_size = chunk_size
+    _worker_chunker.chunk_overlap = chunk_overlap
+    _worker_chunker.min_chunk_size = min_chunk_size
+
+
+def _chunk_blog_in_worker(blog_data: Dict[str, Any], strategy: str) -> Tuple[List[TextChunk], Optional[str]]:
+    """Chunk one blog in a worker process."""
+    return _worker_chunker._chunk_blog_or_error(blog_data, strategy)
+
+
 def main():
     """Main function to run text chunking."""
     chunker = TextChunker()
@@ -578,6 +802,7 @@ def main():
         
         print(f"✅ {strategy} chunking completed")
     
+    chunker.close()
     print("\n🎉 Text chunking process completed!")
 
 
@@ -8,34 +8,148 @@ and ChromaDB for the RAG application.
 Usage:
     python embeddings_sentence_transformers.py
 """
+import os
+import re
 import sys
 import logging
+import importlib.util
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from tqdm import tqdm
+import torch
 
 # Use common setup to avoid path issues
-from rag_app.common_setup import setup_environment, get_database_path, get_vector_db_path
+from rag_app.common_setup import setup_environment, get_database_path, get_vector_db_path, get_project_root
 
-# Setup enhanced logging
+# Setup enhanced logging (set RAG_LOG_LEVEL=DEBUG for verbose output)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=os.environ.get("RAG_LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('rag_app_embeddings.log', mode='w')
+        logging.FileHandler(get_project_root() / 'rag_app_embeddings.log', mode='w')
     ]
 )
 logger = logging.getLogger(__name__)
 
+import sentence_transformers
 from sentence_transformers import SentenceTransformer
 import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 
+# SentenceTransformer(backend="onnx") exists from sentence-transformers 3.2 and
+# needs optimum[onnxruntime]; chromadb installs onnxruntime on its own, so the
+# runtime alone is not enough. Checked by spec to avoid importing the packages.
+ONNX_BACKEND_AVAILABLE = (
+    tuple(int(part) for part in re.findall(r"\d+", sentence_transformers.__version__)[:2]) >= (3, 2)
+    and importlib.util.find_spec("onnxruntime") is not None
+    and importlib.util.find_spec("optimum") is not None
+)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Below this many texts the multi-process pool's startup cost outweighs its speedup
+MULTI_PROCESS_MIN_TEXTS = 1000
+
+# Number of query embeddings kept for repeated questions
+QUERY_CACHE_SIZE = 256
+
+# Upper bound on the characters in one encode() mini-batch; long texts get smaller batches
+ENCODE_MAX_BATCH_CHARS = 150_000
+
+# Texts are clipped to max_seq_length * this many characters before tokenization;
+# wordpiece tokens average ~4 characters, so the clip never reaches kept tokens
+# in ordinary prose but spares tokenizing whole blogs that get truncated anyway
+ENCODE_CHARS_PER_TOKEN = 16
+
+# Loaded models and open ChromaDB clients, shared by every embedding system in the
+# process so creating another instance does not reload weights or reopen the store
+_MODEL_CACHE = {}
+_CLIENT_CACHE = {}
+
+# Model whose tokenizer counts the n_tokens stored with each chunk at ingestion
+TOKEN_COUNT_MODEL = "gpt-3.5-turbo"
+
+# Set once RAG_TORCH_THREADS has been applied (see _configure_torch_threads)
+_TORCH_THREADS_CONFIGURED = False
+
+# torch<1.13 reports CUDA out-of-memory as a plain RuntimeError
+CUDA_OOM_ERROR = getattr(torch.cuda, "OutOfMemoryError", RuntimeError)
+
 from rag_app.data_processing.text_chunker import TextChunker
 
 
+# Marks a chunk object without a content attribute (as opposed to content=None)
+_NO_CONTENT = object()
+
+
+def _configure_torch_threads() -> None:
+    """
+    Apply RAG_TORCH_THREADS to torch's CPU thread pool, once per process.
+    
+    Opt-in: without the variable (or with a CUDA device) torch keeps its own
+    defaults. The pool is only ever enlarged, never set below its current size.
+    """
+    global _TORCH_THREADS_CONFIGURED
+    if _TORCH_THREADS_CONFIGURED:
+        return
+    _TORCH_THREADS_CONFIGURED = True
+    
+    threads = os.environ.get("RAG_TORCH_THREADS")
+    if threads and not torch.cuda.is_available() and int(threads) > torch.get_num_threads():
+        torch.set_num_threads(int(threads))
+
+
+def _chunk_fields(chunk: Any) -> tuple:
+    """
+    Return (content, title, company, url, chunk_type, topic) for a chunk.
+    
+    Dict chunks use .get() and TextChunk-like objects use getattr(), each with a
+    '' default, so missing fields cost one lookup instead of hasattr + access.
+    Objects without a content attribute fall back to str(chunk); a content
+    attribute that is None stays None, so the caller skips the chunk.
+    """
+    if isinstance(chunk, dict):
+        get = chunk.get
+        return (get('content', ''), get('title', ''), get('company', ''),
+                get('url', ''), get('chunk_type', ''), get('topic', ''))
+    content = getattr(chunk, 'content', _NO_CONTENT)
+    return (str(chunk) if content is _NO_CONTENT else content,
+            getattr(chunk, 'title', ''), getattr(chunk, 'company', ''),
+            getattr(chunk, 'url', ''), getattr(chunk, 'chunk_type', ''),
+            getattr(chunk, 'topic', ''))
+
+
+def _open_collection(client: Any, name: str) -> Any:
+    """
+    Open the named ChromaDB collection, creating it if it does not exist.
+    
+    An existing collection is returned unchanged: chromadb versions differ in
+    whether new metadata overwrites its distance space or is rejected, so
+    stores built with cosine distance stay cosine. New collections use inner
+    product, which equals cosine similarity for the unit-normalized
+    embeddings without per-distance norms, and larger HNSW batch/sync
+    thresholds so bulk ingest inserts into the graph (multi-threaded) and
+    persists it in fewer, larger steps.
+    """
+    try:
+        return client.get_collection(name=name)
+    except Exception:  # ValueError, InvalidCollectionException or NotFoundError by chromadb version
+        return client.create_collection(
+            name=name,
+            metadata={
+                "hnsw:space": "ip",
+                "hnsw:batch_size": 1000,
+                "hnsw:sync_threshold": 10000
+            }
+        )
+
+
 class SentenceTransformersEmbeddingSystem:
     """Embedding system using sentence-transformers and ChromaDB."""
     
@@ -43,7 +157,9 @@ class SentenceTransformersEmbeddingSystem:
                  model_name: str = "all-MiniLM-L6-v2",
                  db_path: str = None,
                  vector_db_path: str = None,
-                 collection_name: str = "blog_chunks"):
+                 collection_name: str = "blog_chunks",
+                 use_onnx: bool = True,
+                 max_seq_length: Optional[int] = None):
         """
         Initialize the embedding system.
         
@@ -52,36 +168,169 @@ class SentenceTransformersEmbeddingSystem:
             db_path: Path to SQLite database
             vector_db_path: Path to ChromaDB storage
             collection_name: Name of the ChromaDB collection
+            use_onnx: Run the model through ONNX Runtime when the backend is available (CPU only)
+            max_seq_length: Optional upper bound on tokens per text; longer inputs are
+                truncated. None keeps the model's own limit, so embeddings match
+                those already stored
         """
         self.model_name = model_name
         self.db_path = db_path or str(get_database_path())
         self.vector_db_path = vector_db_path or str(get_vector_db_path())
         self.collection_name = collection_name
         
-        # Initialize sentence transformer model
-        print(f"🔄 Loading sentence transformer model: {model_name}")
-        self.model = SentenceTransformer(model_name)
-        print(f"✅ Model loaded successfully!")
+        _configure_torch_threads()
         
-        # Initialize ChromaDB
+        # Initialize sentence transformer model (reused if this process already loaded it)
+        model_key = (model_name, use_onnx, max_seq_length)
+        if model_key not in _MODEL_CACHE:
+            print(f"🔄 Loading sentence transformer model: {model_name}")
+            model = self._load_model(model_name, use_onnx)
+            if max_seq_length and (not model.max_seq_length or model.max_seq_length > max_seq_length):
+                model.max_seq_length = max_seq_length
+            # One tiny forward pass pays for CUDA context / kernel selection and
+            # ONNX session setup here instead of on the first user query
+            model.encode(["warmup"], convert_to_numpy=True, normalize_embeddings=True)
+            _MODEL_CACHE[model_key] = model
+            print(f"✅ Model loaded successfully!")
+        self.model = _MODEL_CACHE[model_key]
+        # Inputs are only clipped before tokenization when the caller capped the length
+        self._max_encode_chars = self.model.max_seq_length * ENCODE_CHARS_PER_TOKEN if max_seq_length else None
+        self._embed_dim = self.model.get_sentence_embedding_dimension()
+        self._encode_pool = None  # Multi-GPU encode pool, started on first large encode
+        self._query_cache = {}  # Query string -> embedding row, oldest first
+        self.store_version = 0  # Bumped by store_embeddings so retrieval caches can tell the store changed
+        
+        # Initialize ChromaDB (one client per storage path). The resolved path is
+        # used so the store does not depend on the caller's working directory
         print(f"🔄 Initializing ChromaDB...")
-        self.client = chromadb.PersistentClient(
-            path=vector_db_path,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
+        if self.vector_db_path not in _CLIENT_CACHE:
+            _CLIENT_CACHE[self.vector_db_path] = chromadb.PersistentClient(
+                path=self.vector_db_path,
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
             )
-        )
+        self.client = _CLIENT_CACHE[self.vector_db_path]
         
-        # Create or get collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Get or create collection (existing collections keep their settings)
+        self.collection = _open_collection(self.client, collection_name)
         
         print(f"✅ ChromaDB initialized with collection: {collection_name}")
     
-    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    def _load_model(self, model_name: str, use_onnx: bool) -> SentenceTransformer:
+        """
+        Load the sentence transformer for the best available runtime.
+        
+        On a CUDA device the PyTorch model is moved to the GPU and cast to half
+        precision. On CPU the ONNX Runtime backend (sentence-transformers>=3.2
+        with optimum[onnxruntime]) is preferred; it exports the model on first
+        load and keeps the same encode() interface. Any failure falls back to
+        the default PyTorch model.
+        """
+        if torch.cuda.is_available():
+            model = SentenceTransformer(model_name, device="cuda")
+            model.half()
+            print("⚡ Using CUDA with FP16 weights")
+            return model
+        
+        if use_onnx and ONNX_BACKEND_AVAILABLE:
+            try:
+                model = SentenceTransformer(model_name, backend="onnx")
+                print("⚡ Using ONNX Runtime backend")
+                return model
+            except Exception as e:
+                print(f"⚠️ ONNX backend unavailable ({e}), using PyTorch")
+        return SentenceTransformer(model_name)
+    
+    def _encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Encode texts into an (n_texts, dim) array.
+        
+        With a max_seq_length cap, texts are clipped to a character bound well
+        past that many tokens before tokenization. They are then taken longest
+        first in mini-batches of at most batch_size texts and
+        ENCODE_MAX_BATCH_CHARS characters, so only mini-batches of long texts
+        get smaller. Consecutive mini-batches of the same size share one
+        encode() call (see _encode_groups). Rows are L2-normalized and returned
+        in input order.
+        
+        Errors are not turned into placeholder vectors: one failing group
+        raises for the whole call, so callers never persist zero embeddings.
+        
+        Args:
+            texts: List of text strings to embed
+            batch_size: Largest batch size used inside encode()
+            
+        Returns:
+            Array of embedding vectors, one row per text
+        """
+        # Clip only what the tokenizer sees; callers keep the full documents
+        max_chars = self._max_encode_chars
+        if max_chars:
+            texts = [text[:max_chars] for text in texts]
+        
+        embeddings = np.empty((len(texts), self._embed_dim), dtype=np.float32)
+        for group_batch_size, indices in self._encode_groups(texts, batch_size):
+            # FP16 models return float16; the assignment casts to float32 for ChromaDB
+            embeddings[indices] = self._encode_with_backoff([texts[i] for i in indices], group_batch_size)
+        # Rows are C-contiguous, so per-batch slices are zero-copy views
+        return embeddings
+    
+    @staticmethod
+    def _encode_groups(texts: List[str], batch_size: int) -> List[tuple]:
+        """
+        Split texts into (batch_size, indices) groups that each fit ENCODE_MAX_BATCH_CHARS.
+        
+        Texts are taken longest first; each mini-batch holds up to batch_size
+        texts, fewer when its longest (first) text times the count would exceed
+        ENCODE_MAX_BATCH_CHARS. Runs of mini-batches with the same size are
+        merged into one group, so a store batch is usually encoded in a few calls.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        groups = []
+        pos = 0
+        while pos < len(order):
+            size = max(1, min(batch_size, ENCODE_MAX_BATCH_CHARS // max(1, len(texts[order[pos]]))))
+            if groups and groups[-1][0] == size:
+                groups[-1][1].extend(order[pos:pos + size])
+            else:
+                groups.append((size, order[pos:pos + size]))
+            pos += size
+        return groups
+    
+    def _encode_with_backoff(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode texts, halving the batch size and retrying on CUDA out-of-memory errors."""
+        while True:
+            try:
+                return self._encode_texts(texts, batch_size)
+            except CUDA_OOM_ERROR:
+                if batch_size == 1:
+                    raise
+                batch_size //= 2
+                torch.cuda.empty_cache()
+                logger.warning("CUDA out of memory while encoding, retrying with batch_size=%d", batch_size)
+    
+    def _encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Run encode() on one device, or on a pool of one process per GPU for large inputs."""
+        if len(texts) >= MULTI_PROCESS_MIN_TEXTS and torch.cuda.device_count() > 1:
+            # Data-parallel encode with one worker process per visible GPU
+            if self._encode_pool is None:
+                self._encode_pool = self.model.start_multi_process_pool()
+            embeddings = self.model.encode_multi_process(
+                texts, self._encode_pool, batch_size=batch_size, chunk_size=5000
+            )
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            return embeddings
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=len(texts) > batch_size
+        )
+    
+    def generate_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
@@ -90,77 +339,48 @@ class SentenceTransformersEmbeddingSystem:
             batch_size: Batch size for processing
             
         Returns:
-            List of embedding vectors
+            Float32 array of embedding vectors, one row per text
         """
         print(f"🔄 Generating embeddings for {len(texts)} texts...")
         
-        embeddings = []
-        for i in tqdm(range(0, len(texts), batch_size), desc="Generating embeddings"):
-            batch_texts = texts[i:i + batch_size]
-            try:
-                batch_embeddings = self.model.encode(
-                    batch_texts,
-                    convert_to_tensor=False,
-                    show_progress_bar=False
-                )
-                embeddings.extend(batch_embeddings.tolist())
-            except Exception as e:
-                print(f"❌ Error generating embeddings for batch {i//batch_size + 1}: {e}")
-                # Add zero embeddings as fallback
-                embedding_dim = self.model.get_sentence_embedding_dimension()
-                embeddings.extend([[0.0] * embedding_dim for _ in batch_texts])
+        embeddings = self._encode(texts, batch_size=batch_size)
         
         print(f"✅ Generated {len(embeddings)} embeddings")
         return embeddings
     
-    def store_embeddings(self, chunks: List[Dict[str, Any]], batch_size: int = 1000) -> None:
+    def store_embeddings(self, chunks: List[Dict[str, Any]], batch_size: int = 5000) -> None:
         """
         Store chunks and their embeddings in ChromaDB with batch processing.
 
         Args:
             chunks: List of chunk dictionaries with content and metadata
-            batch_size: Maximum number of chunks to process at once
+            batch_size: Maximum number of chunks per collection.add() call; capped
+                at the client's maximum batch size
         """
         logger.info(f"Storing {len(chunks)} chunks in ChromaDB with batch size {batch_size}...")
 
         try:
-            # Extract texts and metadata with detailed logging
-            texts = []
-            metadatas = []
-            ids = []
+            # Extract the fields of every chunk that has content
+            records = []
 
             for i, chunk in enumerate(chunks):
-                logger.debug(f"Processing chunk {i}: {type(chunk)}")
-
-                # Handle different chunk formats
-                if isinstance(chunk, dict):
-                    # Handle dictionary chunks
-                    content = chunk.get('content', '')
-                    title = chunk.get('title', '')
-                    company = chunk.get('company', '')
-                    url = chunk.get('url', '')
-                    chunk_type = chunk.get('chunk_type', '')
-                    topic = chunk.get('topic', '')
-                else:
-                    # Handle TextChunk objects
-                    try:
-                        content = chunk.content if hasattr(chunk, 'content') else str(chunk)
-                        title = chunk.title if hasattr(chunk, 'title') else ''
-                        company = chunk.company if hasattr(chunk, 'company') else ''
-                        url = chunk.url if hasattr(chunk, 'url') else ''
-                        chunk_type = chunk.chunk_type if hasattr(chunk, 'chunk_type') else ''
-                        topic = chunk.topic if hasattr(chunk, 'topic') else ''
-                    except Exception as e:
-                        logger.error(f"Error accessing chunk {i} attributes: {e}")
-                        continue
+                # Handle dictionary chunks and TextChunk objects alike
+                try:
+                    fields = _chunk_fields(chunk)
+                except Exception as e:
+                    logger.error("Error accessing chunk %d attributes: %s", i, e)
+                    continue
 
-                if not content:
-                    logger.warning(f"Chunk {i} has no content, skipping")
+                if not fields[0]:
+                    logger.warning("Chunk %d has no content, skipping", i)
                     continue
 
-                texts.append(content)
+                records.append((i, *fields))
 
-                metadata = {
+            # Build the parallel texts/metadatas/ids columns in one comprehension each
+            texts = [record[1] for record in records]
+            metadatas = [
+                {
                     'title': title,
                     'company': company,
                     'url': url,
@@ -169,8 +389,9 @@ class SentenceTransformersEmbeddingSystem:
                     'topic': topic,
                     'chunk_size': len(content)
                 }
-                metadatas.append(metadata)
-                ids.append(f"chunk_{i}")
+                for i, content, title, company, url, chunk_type, topic in records
+            ]
+            ids = [f"chunk_{record[0]}" for record in records]
 
             logger.info(f"Extracted {len(texts)} texts for embedding")
 
@@ -179,35 +400,110 @@ class SentenceTransformersEmbeddingSystem:
                 return
 
             # Process in batches to avoid ChromaDB batch size limits
+            get_max_batch_size = getattr(self.client, 'get_max_batch_size', None)  # chromadb>=0.5
+            max_batch_size = get_max_batch_size() if get_max_batch_size else getattr(self.client, 'max_batch_size', batch_size)
+            batch_size = min(batch_size, max_batch_size)
             total_batches = (len(texts) + batch_size - 1) // batch_size
             logger.info(f"Processing {len(texts)} chunks in {total_batches} batches of {batch_size}")
 
-            for batch_idx in range(0, len(texts), batch_size):
-                batch_end = min(batch_idx + batch_size, len(texts))
-                batch_texts = texts[batch_idx:batch_end]
-                batch_metadatas = metadatas[batch_idx:batch_end]
-                batch_ids = ids[batch_idx:batch_end]
-                
-                logger.info(f"Processing batch {batch_idx//batch_size + 1}/{total_batches} ({len(batch_texts)} chunks)")
-                
-                # Generate embeddings for this batch
-                batch_embeddings = self.generate_embeddings(batch_texts)
+            # Store each chunk's LLM token count so retrieval never re-tokenizes it
+            token_encoding = None
+            if TIKTOKEN_AVAILABLE:
+                try:
+                    token_encoding = tiktoken.encoding_for_model(TOKEN_COUNT_MODEL)
+                except Exception as e:
+                    logger.warning(f"Could not load tiktoken encoding, storing chunks without n_tokens: {e}")
+
+            self.store_version += 1
+            
+            # Each batch is encoded while the previous batch is still being added to
+            # ChromaDB on a background thread; at most one add() is in flight
+            skipped = 0
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                pending = None
+                pending_number = None
+                for batch_idx in range(0, len(texts), batch_size):
+                    batch_end = min(batch_idx + batch_size, len(texts))
+                    batch_texts = texts[batch_idx:batch_end]
+                    batch_number = batch_idx // batch_size + 1
+                    
+                    logger.info(f"Processing batch {batch_number}/{total_batches} ({len(batch_texts)} chunks)")
+                    
+                    # Generate embeddings for this batch; a failed batch is skipped
+                    # rather than stored with placeholder vectors
+                    try:
+                        batch_embeddings = self._encode(batch_texts)
+                    except Exception as e:
+                        skipped += len(batch_texts)
+                        logger.error(f"Error generating embeddings for batch {batch_number}/{total_batches}, "
+                                     f"skipping {len(batch_texts)} chunks: {e}", exc_info=True)
+                        continue
+                    batch_metadatas = metadatas[batch_idx:batch_end]
+                    if token_encoding is not None:
+                        for metadata, tokens in zip(batch_metadatas, token_encoding.encode_ordinary_batch(batch_texts)):
+                            metadata['n_tokens'] = len(tokens)
+                    
+                    if pending is not None:
+                        pending.result()
+                        logger.info(f"Successfully stored batch {pending_number}/{total_batches}")
+                    
+                    # Store this batch in ChromaDB
+                    pending = executor.submit(
+                        self.collection.add,
+                        embeddings=batch_embeddings,
+                        documents=batch_texts,
+                        metadatas=batch_metadatas,
+                        ids=ids[batch_idx:batch_end]
+                    )
+                    pending_number = batch_number
                 
-                # Store this batch in ChromaDB
-                self.collection.add(
-                    embeddings=batch_embeddings,
-                    documents=batch_texts,
-                    metadatas=batch_metadatas,
-                    ids=batch_ids
-                )
-                logger.info(f"Successfully stored batch {batch_idx//batch_size + 1}/{total_batches}")
+                if pending is not None:
+                    pending.result()
+                    logger.info(f"Successfully stored batch {pending_number}/{total_batches}")
 
-            logger.info(f"Successfully stored all {len(texts)} chunks in ChromaDB")
+            if skipped:
+                logger.warning(f"Stored {len(texts) - skipped} chunks in ChromaDB; "
+                               f"skipped {skipped} chunks whose embeddings failed")
+            else:
+                logger.info(f"Successfully stored all {len(texts)} chunks in ChromaDB")
 
         except Exception as e:
             logger.error(f"Error storing embeddings: {e}", exc_info=True)
             raise
     
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Return normalized embeddings for query strings, one row per query.
+        
+        Embeddings are memoized per query so repeated questions skip the model
+        forward pass; all uncached queries are encoded together in one encode()
+        call, and the oldest entry is evicted beyond QUERY_CACHE_SIZE.
+        """
+        missing = [query for query in dict.fromkeys(queries) if query not in self._query_cache]
+        if missing:
+            embeddings = self.model.encode(missing, convert_to_tensor=False, normalize_embeddings=True)
+            for query, embedding in zip(missing, embeddings):
+                if len(self._query_cache) >= QUERY_CACHE_SIZE:
+                    del self._query_cache[next(iter(self._query_cache))]
+                self._query_cache[query] = embedding
+        return np.stack([self._query_cache[query] for query in queries])
+    
+    @staticmethod
+    def _format_results(documents: List[str], metadatas: List[Dict[str, Any]],
+                        distances: List[float]) -> List[Dict[str, Any]]:
+        """Build result dicts in one pass over ChromaDB's parallel result columns."""
+        return [
+            {
+                'content': document,
+                'metadata': metadata,
+                'score': 1 - distance,  # cosine and ip distances are both 1 - similarity here
+                'chunk_type': metadata.get('chunk_type', ''),
+                'title': metadata.get('title', ''),
+                'company': metadata.get('company', '')
+            }
+            for document, metadata, distance in zip(documents, metadatas, distances)
+        ]
+    
     def query_vectors(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
         """
         Query the vector database for similar chunks.
@@ -223,27 +519,20 @@ class SentenceTransformersEmbeddingSystem:
         
         try:
             # Generate query embedding
-            query_embedding = self.model.encode([query], convert_to_tensor=False)
+            query_embedding = self._embed_queries([query])
             
             # Query ChromaDB
             results = self.collection.query(
-                query_embeddings=query_embedding.tolist(),
+                query_embeddings=query_embedding,
                 n_results=n_results
             )
             
             # Format results
             formatted_results = []
             if results['documents'] and results['documents'][0]:
-                for i in range(len(results['documents'][0])):
-                    result = {
-                        'content': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i],
-                        'score': 1 - results['distances'][0][i],  # Convert distance to similarity
-                        'chunk_type': results['metadatas'][0][i].get('chunk_type', ''),
-                        'title': results['metadatas'][0][i].get('title', ''),
-                        'company': results['metadatas'][0][i].get('company', '')
-                    }
-                    formatted_results.append(result)
+                formatted_results = self._format_results(
+                    results['documents'][0], results['metadatas'][0], results['distances'][0]
+                )
             
             print(f"✅ Found {len(formatted_results)} similar chunks")
             return formatted_results
@@ -252,6 +541,48 @@ class SentenceTransformersEmbeddingSystem:
             print(f"❌ Error querying vectors: {e}")
             return []
     
+    def query_vectors_batch(self, queries: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Query the vector database for several queries at once.
+        
+        All queries are embedded in a single encode() call and searched with a
+        single ChromaDB query, instead of one model pass and one round trip each.
+        
+        Args:
+            queries: Query strings
+            n_results: Number of results to return per query
+            
+        Returns:
+            One list of similar chunks with scores per query, in input order
+        """
+        if not queries:
+            return []
+        
+        print(f"🔍 Querying {len(queries)} queries")
+        
+        try:
+            results = self.collection.query(
+                query_embeddings=self._embed_queries(queries),
+                n_results=n_results
+            )
+            
+            return [
+                self._format_results(query_documents, query_metadatas, query_distances)
+                for query_documents, query_metadatas, query_distances in zip(
+                    results['documents'], results['metadatas'], results['distances']
+                )
+            ]
+            
+        except Exception as e:
+            print(f"❌ Error querying vectors: {e}")
+            return [[] for _ in queries]
+    
+    def close(self) -> None:
+        """Stop the multi-GPU encode pool if one was started."""
+        if self._encode_pool is not None:
+            self.model.stop_multi_process_pool(self._encode_pool)
+            self._encode_pool = None
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection."""
         try:
@@ -268,6 +599,8 @@ class SentenceTransformersEmbeddingSystem:
 
 def main():
     """Main function to demonstrate the embedding system."""
+    setup_environment()
+    
     print("🚀 Sentence Transformers Embedding System")
     print("=" * 50)
     
@@ -327,6 +660,8 @@ def main():
         print(f"  Total chunks: {stats.get('total_chunks', 0)}")
         print(f"  Model: {stats.get('model_name', 'N/A')}")
         
+        embedding_system.close()
+        
         print("\n🎉 Sentence Transformers Embedding System Test Completed!")
         
     except Exception as e:
@@ -15,8 +15,7 @@ from pathlib import Path
 
 # Use common setup to avoid path issues
 from common_setup import setup_environment
-
-from improved_rag_system import ImprovedRAGSystem
+setup_environment()
 
 
 def print_welcome():
@@ -36,6 +35,7 @@ def print_help():
     print("- 'quit', 'exit', or 'q': Exit the program")
     print("- 'status': Show system status")
     print("- 'sources': Show last answer sources")
+    print("- 'reload': Forget cached retrievals after re-ingesting chunks")
     print("- Any other text: Ask a question")
     print("\n💡 Tips for better answers:")
     print("- Be specific in your questions")
@@ -49,7 +49,10 @@ def print_status(rag_system):
     print("\n🔍 System Status:")
     print(f"- OpenAI Integration: {'✅ Enabled' if rag_system.use_openai else '❌ Disabled'}")
     print(f"- Max Context Chunks: {rag_system.max_context_chunks}")
-    print(f"- Context Window: {rag_system.context_window} characters")
+    if rag_system.token_budgeting:
+        print(f"- Context Window: {rag_system.context_window_tokens} tokens")
+    else:
+        print(f"- Context Window: {rag_system.context_window} characters")
     print(f"- Embedding Model: {rag_system.embedding_system.model_name}")
     
     if not rag_system.use_openai:
@@ -58,6 +61,12 @@ def print_status(rag_system):
         print("   Then restart this program")
 
 
+def print_token(text):
+    """Print a piece of a streamed answer as soon as it arrives."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
 def print_sources(sources):
     """Print sources from last answer."""
     if not sources:
@@ -84,6 +93,8 @@ def main():
     # Initialize the improved RAG system
     print("\n🔄 Initializing improved RAG system...")
     try:
+        # Imported here so the banner shows before torch/chromadb finish loading
+        from improved_rag_system import ImprovedRAGSystem
         rag_system = ImprovedRAGSystem()
         print("✅ Improved RAG system ready!")
         
@@ -123,6 +134,11 @@ def main():
                 print_sources(last_sources)
                 continue
             
+            elif user_input.lower() == 'reload':
+                rag_system.clear_cache()
+                print("✅ Retrieval cache cleared")
+                continue
+            
             elif not user_input:
                 print("Please enter a question or command.")
                 continue
@@ -131,13 +147,11 @@ def main():
             print(f"\n🔍 Processing: '{user_input}'")
             print("🔄 Searching for relevant information...")
             
-            # Get answer from improved RAG system
-            result = rag_system.answer_question(user_input)
-            
-            # Display answer
+            # Get answer from improved RAG system, streaming it as it is generated
             print(f"\n🤖 Answer:")
             print("-" * 40)
-            print(result['answer'])
+            result = rag_system.answer_question(user_input, on_token=print_token)
+            print()
             
             # Display sources
             if result['sources']:
@@ -16,12 +16,19 @@ import os
 import sys
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import json
 import re
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 # Use common setup to avoid path issues
-from common_setup import setup_environment, get_database_path, get_vector_db_path
+from common_setup import (setup_environment, get_database_path, get_vector_db_path, get_project_root,
+                          RetrievalCache, TRUNCATED_ANSWER_NOTICE)
+if __name__ == "__main__":
+    # Run as a script: the embeddings import below needs the project root on
+    # sys.path, so set up before it rather than in main(); importers are untouched
+    setup_environment()
 
 # Setup enhanced logging
 logging.basicConfig(
@@ -29,7 +36,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('improved_rag_system.log', mode='w')
+        logging.FileHandler(get_project_root() / 'improved_rag_system.log', mode='w')
     ]
 )
 logger = logging.getLogger(__name__)
@@ -43,6 +50,21 @@ except ImportError:
     OPENAI_AVAILABLE = False
     logger.warning("OpenAI not available. Install with: pip install openai")
 
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Number of chunk token counts kept so repeated chunks are encoded only once
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+# Most OpenAI requests answer_questions() keeps in flight at once
+LLM_MAX_CONCURRENCY = 5
+
+# System message sent with every OpenAI request
+OPENAI_SYSTEM_PROMPT = "You are an expert system design consultant."
+
 
 class ImprovedRAGSystem:
     """Enhanced RAG system with better context building and LLM integration."""
@@ -51,19 +73,27 @@ class ImprovedRAGSystem:
                  embedding_system: Optional[SentenceTransformersEmbeddingSystem] = None,
                  max_context_chunks: int = 8,
                  context_window: int = 6000,
-                 use_openai: bool = True):
+                 use_openai: bool = True,
+                 context_window_tokens: int = 1500):
         """
         Initialize the improved RAG system.
         
         Args:
             embedding_system: Pre-initialized embedding system
             max_context_chunks: Maximum number of chunks to retrieve
-            context_window: Maximum context window size
+            context_window: Maximum context window size in characters
             use_openai: Whether to use OpenAI for answer generation
+            context_window_tokens: Maximum prompt size in gpt-3.5-turbo tokens,
+                including the instructions and source headers, used instead of
+                context_window when OpenAI is enabled and tiktoken is installed
         """
         self.max_context_chunks = max_context_chunks
         self.context_window = context_window
+        self.context_window_tokens = context_window_tokens
         self.use_openai = use_openai and OPENAI_AVAILABLE
+        self._retrieval_cache = RetrievalCache()  # (query, n_results) -> selected chunks
+        self._encoding = None  # tiktoken encoding; None means budget by characters
+        self._token_counts = {}  # chunk content -> token count, oldest first
         
         # Initialize embedding system
         if embedding_system:
@@ -82,8 +112,21 @@ class ImprovedRAGSystem:
                 logger.warning("No OpenAI API key found - using retrieval-only mode")
                 self.use_openai = False
         
+        # Budget the context in the tokens the model is billed for
+        if self.use_openai and TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+                logger.info(f"Context budget: {context_window_tokens} tokens")
+            except Exception as e:
+                logger.warning(f"Could not load tiktoken encoding, budgeting context by characters: {e}")
+        
         logger.info("Improved RAG System initialized successfully")
     
+    @property
+    def token_budgeting(self) -> bool:
+        """Whether the context is budgeted in tokens (context_window_tokens) rather than characters."""
+        return self._encoding is not None
+    
     def retrieve_relevant_chunks(self, query: str, n_results: int = None) -> List[Dict[str, Any]]:
         """
         Retrieve relevant chunks with improved ranking and filtering.
@@ -98,6 +141,12 @@ class ImprovedRAGSystem:
         if n_results is None:
             n_results = self.max_context_chunks
         
+        cache_key = (query, n_results)
+        cached_chunks = self._retrieval_cache.get(cache_key, self.embedding_system.store_version)
+        if cached_chunks is not None:
+            logger.info(f"Using cached chunks for query: '{query[:50]}...'")
+            return cached_chunks
+        
         logger.info(f"Retrieving relevant chunks for query: '{query[:50]}...'")
         
         # Get initial results
@@ -107,14 +156,23 @@ class ImprovedRAGSystem:
             logger.warning("No relevant chunks found")
             return []
         
+        selected_chunks = self._rank_and_select(results, query)
+        
+        logger.info(f"Retrieved {len(selected_chunks)} relevant chunks")
+        self._retrieval_cache.put(cache_key, selected_chunks, self.embedding_system.store_version)
+        return selected_chunks
+    
+    def _rank_and_select(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        """Re-rank vector search results for a query and keep those that fit the context."""
         # Enhanced ranking and filtering
         improved_results = self._enhance_chunk_ranking(results, query)
         
         # Select top chunks that fit context window
-        selected_chunks = self._select_chunks_for_context(improved_results)
-        
-        logger.info(f"Retrieved {len(selected_chunks)} relevant chunks")
-        return selected_chunks
+        return self._select_chunks_for_context(improved_results, query)
+    
+    def clear_cache(self) -> None:
+        """Forget cached retrievals, e.g. after chunks were re-ingested by another process."""
+        self._retrieval_cache.clear()
     
     def _enhance_chunk_ranking(self, chunks: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
         """
@@ -146,8 +204,8 @@ class ImprovedRAGSystem:
             keyword_bonus = keyword_matches / len(query_words) * 0.1
             
             # Title relevance bonus
-            title = metadata.get('title', '')
-            title_matches = sum(1 for word in query_words if word in title.lower())
+            title_lower = metadata.get('title', '').lower()
+            title_matches = sum(1 for word in query_words if word in title_lower)
             title_bonus = title_matches / len(query_words) * 0.2
             
             # Content length penalty (prefer concise, relevant chunks)
@@ -168,38 +226,90 @@ class ImprovedRAGSystem:
             enhanced_chunks.append(enhanced_chunk)
         
         # Sort by enhanced score
-        enhanced_chunks.sort(key=lambda x: x['enhanced_score'], reverse=True)
+        enhanced_chunks.sort(key=itemgetter('enhanced_score'), reverse=True)
         
         return enhanced_chunks
     
-    def _select_chunks_for_context(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _select_chunks_for_context(self, chunks: List[Dict[str, Any]], query: str = "") -> List[Dict[str, Any]]:
         """
         Select chunks that fit within the context window.
         
         Args:
             chunks: Ranked chunks
+            query: User query, counted towards the token budget
             
         Returns:
             Selected chunks for context
         """
-        selected_chunks = []
-        current_length = 0
+        if self.token_budgeting:
+            return self._select_chunks_by_tokens(chunks, query)
         
-        for chunk in chunks:
-            content_length = len(chunk.get('content', ''))
+        current_length = 0
+        count = 0
+        
+        # Only the ranked prefix is ever taken, so count it and slice once
+        for chunk in chunks[:self.max_context_chunks]:
+            # content_length is set by _enhance_chunk_ranking
+            content_length = chunk.get('content_length')
+            if content_length is None:
+                content_length = len(chunk.get('content', ''))
             
             # Check if adding this chunk would exceed context window
-            if current_length + content_length > self.context_window:
-                break
-            
-            selected_chunks.append(chunk)
             current_length += content_length
+            if current_length > self.context_window:
+                break
+            count += 1
+        
+        return chunks[:count]
+    
+    def _select_chunks_by_tokens(self, chunks: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        """
+        Select chunks so that the whole prompt fits within context_window_tokens.
+        
+        Args:
+            chunks: Ranked chunks
+            query: User query
             
-            # Stop if we have enough chunks
-            if len(selected_chunks) >= self.max_context_chunks:
+        Returns:
+            Selected chunks for context
+        """
+        # The instructions, question and context heading are sent whatever is selected
+        context_heading = "\n".join(self._context_heading(query) + [""])
+        current_tokens = (self._count_tokens(OPENAI_SYSTEM_PROMPT) +
+                          self._count_tokens(self._build_prompt(query, context_heading)))
+        count = 0
+        
+        for i, chunk in enumerate(chunks[:self.max_context_chunks], 1):
+            # Chunks stored with tiktoken installed carry their count in the metadata
+            n_tokens = chunk.get('metadata', {}).get('n_tokens')
+            if n_tokens is None:
+                n_tokens = self._count_tokens(chunk.get('content', ''))
+            # Source lines and separators build_comprehensive_context() wraps around it
+            chunk_frame = "\n".join(self._source_lines(i, chunk) + ["", "", "", "-" * 30, "", ""])
+            current_tokens += n_tokens + self._count_tokens(chunk_frame)
+            if current_tokens > self.context_window_tokens:
                 break
+            count += 1
         
-        return selected_chunks
+        return chunks[:count]
+    
+    def _count_tokens(self, content: str) -> int:
+        """
+        Count the gpt-3.5-turbo tokens in a piece of prompt text, memoized by content.
+        
+        Args:
+            content: Chunk or prompt text
+            
+        Returns:
+            Number of tokens
+        """
+        n_tokens = self._token_counts.get(content)
+        if n_tokens is None:
+            n_tokens = len(self._encoding.encode(content, disallowed_special=()))
+            if len(self._token_counts) >= TOKEN_COUNT_CACHE_SIZE:
+                del self._token_counts[next(iter(self._token_counts))]
+            self._token_counts[content] = n_tokens
+        return n_tokens
     
     def build_comprehensive_context(self, chunks: List[Dict[str, Any]], query: str) -> str:
         """
@@ -215,60 +325,102 @@ class ImprovedRAGSystem:
         if not chunks:
             return "No relevant information found."
         
-        context_parts = []
-        
         # Add query context
-        context_parts.append(f"Question: {query}")
-        context_parts.append("")
-        context_parts.append("Relevant Information:")
-        context_parts.append("=" * 50)
+        context_parts = self._context_heading(query)
         
         # Add each chunk with proper attribution
         for i, chunk in enumerate(chunks, 1):
-            content = chunk.get('content', '')
-            metadata = chunk.get('metadata', {})
-            score = chunk.get('enhanced_score', chunk.get('score', 0.0))
-            
-            # Extract source information
-            title = metadata.get('title', 'Unknown Title')
-            company = metadata.get('company', 'Unknown Company')
-            url = metadata.get('url', '')
-            chunk_type = metadata.get('chunk_type', 'paragraph')
-            
-            # Format source attribution
-            source_info = f"Source {i}: {title}"
-            if company and company != 'Unknown Company':
-                source_info += f" ({company})"
-            if url:
-                source_info += f" - {url}"
-            
-            context_parts.append(f"[{i}] {source_info}")
-            context_parts.append(f"Relevance: {score:.3f} | Type: {chunk_type}")
+            context_parts.extend(self._source_lines(i, chunk))
             context_parts.append("")
-            context_parts.append(content)
+            context_parts.append(chunk.get('content', ''))
             context_parts.append("")
             context_parts.append("-" * 30)
             context_parts.append("")
         
         return "\n".join(context_parts)
     
-    def generate_answer_with_llm(self, query: str, context: str) -> str:
+    def _context_heading(self, query: str) -> List[str]:
+        """Lines that open the context built by build_comprehensive_context()."""
+        return [f"Question: {query}", "", "Relevant Information:", "=" * 50]
+    
+    def _source_lines(self, index: int, chunk: Dict[str, Any]) -> List[str]:
+        """
+        Format the attribution lines placed above a chunk in the context.
+        
+        Args:
+            index: 1-based position of the chunk in the context
+            chunk: Selected chunk
+            
+        Returns:
+            Source and relevance lines
+        """
+        metadata = chunk.get('metadata', {})
+        score = chunk.get('enhanced_score', chunk.get('score', 0.0))
+        
+        # Extract source information
+        title = metadata.get('title', 'Unknown Title')
+        company = metadata.get('company', 'Unknown Company')
+        url = metadata.get('url', '')
+        chunk_type = metadata.get('chunk_type', 'paragraph')
+        
+        # Format source attribution
+        source_info = f"Source {index}: {title}"
+        if company and company != 'Unknown Company':
+            source_info += f" ({company})"
+        if url:
+            source_info += f" - {url}"
+        
+        return [f"[{index}] {source_info}", f"Relevance: {score:.3f} | Type: {chunk_type}"]
+    
+    def generate_answer_with_llm(self, query: str, context: str,
+                                 on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate intelligent answer using OpenAI.
         
         Args:
             query: User query
             context: Retrieved context
+            on_token: Optional callback; the completion is streamed and each piece
+                is passed to it as it arrives (fallback answers are passed whole)
             
         Returns:
             Generated answer
         """
+        return self._generate_answer(query, context, on_token)[0]
+    
+    def _generate_answer(self, query: str, context: str,
+                         on_token: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Generate the answer as in generate_answer_with_llm(), with a truncation flag.
+        
+        The flag is True when the OpenAI stream broke off partway; the answer
+        (and the text passed to on_token) then ends with TRUNCATED_ANSWER_NOTICE.
+        """
+        parts = []
+        truncated = False
         if not self.use_openai:
-            return self._generate_simple_answer(query, context)
+            answer = self._generate_simple_answer(query, context)
+        else:
+            answer, truncated = self._complete_with_openai(query, context, parts, on_token)
+            if answer is None:
+                answer = self._generate_simple_answer(query, context)
         
-        try:
-            # Create a comprehensive prompt
-            prompt = f"""You are an expert system design consultant with access to a comprehensive knowledge base of engineering blog posts from top tech companies.
+        if on_token and not parts:
+            on_token(answer)
+        return answer, truncated
+    
+    def _build_prompt(self, query: str, context: str) -> str:
+        """
+        Build the user prompt sent to OpenAI for a question.
+        
+        Args:
+            query: User query
+            context: Retrieved context
+            
+        Returns:
+            Prompt text
+        """
+        return f"""You are an expert system design consultant with access to a comprehensive knowledge base of engineering blog posts from top tech companies.
 
                     Context Information:
                     {context}
@@ -284,23 +436,49 @@ class ImprovedRAGSystem:
                     User Question: {query}
 
                     Please provide a comprehensive, well-structured answer:"""
-
-            response = openai.ChatCompletion.create(
+    
+    def _complete_with_openai(self, query: str, context: str, parts: List[str],
+                              on_token: Optional[Callable[[str], None]]) -> Tuple[Optional[str], bool]:
+        """
+        Run the OpenAI chat completion for a question.
+        
+        Streamed pieces are appended to parts and passed to on_token. Returns the
+        answer (None if the request fails before any text arrived) and whether
+        the stream failed after some text had already been passed on.
+        """
+        try:
+            request = dict(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": "You are an expert system design consultant."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": OPENAI_SYSTEM_PROMPT},
+                    {"role": "user", "content": self._build_prompt(query, context)}
                 ],
                 max_tokens=1000,
                 temperature=0.7
             )
             
-            answer = response.choices[0].message.content.strip()
-            return answer
+            if on_token is None:
+                response = openai.ChatCompletion.create(**request)
+                answer = response.choices[0].message.content.strip()
+                return answer, False
+            
+            # Stream the completion so the first tokens show up right away
+            for chunk in openai.ChatCompletion.create(**request, stream=True):
+                delta = chunk.choices[0].delta.get("content") if chunk.choices else None
+                if delta:
+                    if not parts:
+                        delta = delta.lstrip()
+                    parts.append(delta)
+                    on_token(delta)
+            return "".join(parts).strip(), False
             
         except Exception as e:
             logger.error(f"Error generating answer with OpenAI: {e}")
-            return self._generate_simple_answer(query, context)
+            if not parts:
+                return None, False
+            # Keep what was already shown, but mark it as incomplete
+            on_token(TRUNCATED_ANSWER_NOTICE)
+            return "".join(parts).rstrip() + TRUNCATED_ANSWER_NOTICE, True
     
     def _generate_simple_answer(self, query: str, context: str) -> str:
         """
@@ -319,12 +497,55 @@ class ImprovedRAGSystem:
 
                 For a more comprehensive answer, you might want to ask a more specific question or provide additional context."""
     
-    def answer_question(self, query: str) -> Dict[str, Any]:
+    def answer_questions(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several questions, retrieving chunks for all of them in one batch.
+        
+        Queries without cached chunks are embedded in a single encode() call and
+        searched with a single vector store query; the selected chunks seed the
+        retrieval cache. With OpenAI enabled the answers are then generated
+        concurrently (up to LLM_MAX_CONCURRENCY requests in flight), so the
+        batch takes about as long as its slowest completion.
+        
+        Args:
+            queries: User questions
+            
+        Returns:
+            One answer dictionary per question, in input order
+        """
+        n_results = self.max_context_chunks
+        store_version = self.embedding_system.store_version
+        pending = [query for query in dict.fromkeys(queries)
+                   if not self._retrieval_cache.contains((query, n_results), store_version)]
+        
+        if pending:
+            logger.info(f"Retrieving relevant chunks for {len(pending)} questions in one batch")
+            batch_results = self.embedding_system.query_vectors_batch(pending, n_results * 2)
+            for query, results in zip(pending, batch_results):
+                if results:
+                    self._retrieval_cache.put((query, n_results), self._rank_and_select(results, query),
+                                              store_version)
+        
+        # Retrieval stays on this thread; only the network-bound LLM calls fan out
+        chunks_per_query = [self.retrieve_relevant_chunks(query) for query in queries]
+        
+        if not self.use_openai or len(queries) < 2:
+            return [self._answer_with_chunks(query, chunks)
+                    for query, chunks in zip(queries, chunks_per_query)]
+        
+        with ThreadPoolExecutor(max_workers=min(LLM_MAX_CONCURRENCY, len(queries))) as executor:
+            return list(executor.map(self._answer_with_chunks, queries, chunks_per_query))
+    
+    def answer_question(self, query: str,
+                        on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Answer a question using the improved RAG system.
         
         Args:
             query: User question
+            on_token: Optional callback that receives the answer text as it is
+                produced: LLM completions are streamed piece by piece, other
+                answers arrive in one piece. The full answer is still returned.
             
         Returns:
             Dictionary with answer, sources, and metadata
@@ -334,9 +555,27 @@ class ImprovedRAGSystem:
         # Step 1: Retrieve relevant chunks
         chunks = self.retrieve_relevant_chunks(query)
         
+        return self._answer_with_chunks(query, chunks, on_token)
+    
+    def _answer_with_chunks(self, query: str, chunks: List[Dict[str, Any]],
+                            on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Build the context from retrieved chunks and generate the answer.
+        
+        Args:
+            query: User question
+            chunks: Chunks selected by retrieve_relevant_chunks()
+            on_token: Optional callback for the answer text, as in answer_question()
+            
+        Returns:
+            Dictionary with answer, sources, and metadata
+        """
         if not chunks:
+            answer = "I couldn't find relevant information to answer your question."
+            if on_token:
+                on_token(answer)
             return {
-                'answer': "I couldn't find relevant information to answer your question.",
+                'answer': answer,
                 'sources': [],
                 'metadata': {'chunks_retrieved': 0, 'method': 'no_results'}
             }
@@ -345,12 +584,15 @@ class ImprovedRAGSystem:
         context = self.build_comprehensive_context(chunks, query)
         
         # Step 3: Generate answer
+        truncated = False
         if self.use_openai:
-            answer = self.generate_answer_with_llm(query, context)
+            answer, truncated = self._generate_answer(query, context, on_token)
             method = 'llm_enhanced'
         else:
             answer = self._generate_simple_answer(query, context)
             method = 'retrieval_only'
+            if on_token:
+                on_token(answer)
         
         # Step 4: Prepare sources
         sources = []
@@ -372,7 +614,8 @@ class ImprovedRAGSystem:
                 'chunks_retrieved': len(chunks),
                 'method': method,
                 'context_length': len(context),
-                'use_openai': self.use_openai
+                'use_openai': self.use_openai,
+                'truncated': truncated
             }
         }
 
@@ -394,13 +637,13 @@ def main():
         "How do companies integrate LLMs into their systems?"
     ]
     
-    for i, question in enumerate(test_questions, 1):
+    results = rag_system.answer_questions(test_questions)
+    
+    for i, (question, result) in enumerate(zip(test_questions, results), 1):
         print(f"\n{'='*60}")
         print(f"Question {i}: {question}")
         print('='*60)
         
-        result = rag_system.answer_question(question)
-        
         print(f"\n🤖 Answer:")
         print("-" * 40)
         print(result['answer'])
@@ -19,8 +19,6 @@ sys.path.insert(0, str(project_root))
 # Change to project root directory
 os.chdir(project_root)
 
-from rag_app.rag_system import RAGSystem
-
 
 def print_welcome():
     """Print welcome message."""
@@ -39,6 +37,7 @@ def print_help():
     print("  stats, s         - Show system statistics")
     print("  quit, exit, q    - Exit the program")
     print("  clear, c         - Clear the screen")
+    print("  reload           - Forget cached retrievals after re-ingesting chunks")
     print("\n💡 Example Questions:")
     print("  - How do you design a scalable web application?")
     print("  - What are microservices?")
@@ -46,12 +45,14 @@ def print_help():
     print("  - What is load balancing?")
 
 
-def print_answer(result):
-    """Print formatted answer."""
-    print(f"\n🤖 Answer:")
-    print("-" * 40)
-    print(result['answer'])
-    
+def print_token(text):
+    """Print a piece of a streamed answer as soon as it arrives."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def print_sources(result):
+    """Print the sources of an answer."""
     if result['sources']:
         print(f"\n📚 Sources ({result['num_sources']}):")
         print("-" * 40)
@@ -69,6 +70,8 @@ def main():
     try:
         # Initialize RAG system
         print("🔄 Initializing RAG system...")
+        # Imported here so the banner shows before torch/chromadb finish loading
+        from rag_app.rag_system import RAGSystem
         rag_system = RAGSystem()
         print("✅ RAG system ready!")
         
@@ -104,6 +107,11 @@ def main():
                         print(f"  {key}: {value}")
                     continue
                 
+                elif user_input.lower() == 'reload':
+                    rag_system.clear_cache()
+                    print("✅ Retrieval cache cleared")
+                    continue
+                
                 elif user_input.lower() in ['clear', 'c']:
                     os.system('clear' if os.name == 'posix' else 'cls')
                     print_welcome()
@@ -117,11 +125,15 @@ def main():
                 print(f"\n🔍 Processing: '{user_input}'")
                 print("🔄 Searching for relevant information...")
                 
-                # Get answer (use LLM if available)
-                result = rag_system.answer_question(user_input, use_llm=has_openai)
+                # Get answer (use LLM if available), streaming it as it is generated
+                print(f"\n🤖 Answer:")
+                print("-" * 40)
+                result = rag_system.answer_question(user_input, use_llm=has_openai,
+                                                    on_token=print_token)
+                print()
                 
-                # Print formatted answer
-                print_answer(result)
+                # Print sources
+                print_sources(result)
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye! Happy system design learning!")
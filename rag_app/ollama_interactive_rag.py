@@ -15,8 +15,7 @@ from pathlib import Path
 
 # Use common setup to avoid path issues
 from common_setup import setup_environment
-
-from ollama_rag_system import OllamaRAGSystem
+setup_environment()
 
 
 def print_welcome():
@@ -36,6 +35,7 @@ def print_help():
     print("- 'quit', 'exit', or 'q': Exit the program")
     print("- 'status': Show system status")
     print("- 'sources': Show last answer sources")
+    print("- 'reload': Forget cached retrievals after re-ingesting chunks")
     print("- 'models': Show available Ollama models")
     print("- Any other text: Ask a question")
     print("\n💡 Tips for better answers:")
@@ -102,6 +102,8 @@ def main():
     # Initialize the Ollama RAG system
     print("\n🔄 Initializing Ollama RAG system...")
     try:
+        # Imported here so the banner shows before torch/chromadb finish loading
+        from ollama_rag_system import OllamaRAGSystem
         rag_system = OllamaRAGSystem()
         print("✅ Ollama RAG system ready!")
         
@@ -141,6 +143,11 @@ def main():
                 print_sources(last_sources)
                 continue
             
+            elif user_input.lower() == 'reload':
+                rag_system.clear_cache()
+                print("✅ Retrieval cache cleared")
+                continue
+            
             elif user_input.lower() == 'models':
                 print_models()
                 continue
@@ -14,11 +14,16 @@ import sys
 import logging
 import requests
 import json
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 # Use common setup to avoid path issues
-from common_setup import setup_environment, get_database_path, get_vector_db_path
+from common_setup import setup_environment, get_database_path, get_vector_db_path, get_project_root, RetrievalCache
+if __name__ == "__main__":
+    # Run as a script: the embeddings import below needs the project root on
+    # sys.path, so set up before it rather than in main(); importers are untouched
+    setup_environment()
 
 # Setup enhanced logging
 logging.basicConfig(
@@ -26,7 +31,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('ollama_rag_system.log', mode='w')
+        logging.FileHandler(get_project_root() / 'ollama_rag_system.log', mode='w')
     ]
 )
 logger = logging.getLogger(__name__)
@@ -57,6 +62,7 @@ class OllamaRAGSystem:
         self.ollama_url = ollama_url
         self.max_context_chunks = max_context_chunks
         self.context_window = context_window
+        self._retrieval_cache = RetrievalCache()  # (query, n_results) -> selected chunks
         
         # Initialize embedding system
         if embedding_system:
@@ -106,6 +112,12 @@ class OllamaRAGSystem:
         if n_results is None:
             n_results = self.max_context_chunks
         
+        cache_key = (query, n_results)
+        cached_chunks = self._retrieval_cache.get(cache_key, self.embedding_system.store_version)
+        if cached_chunks is not None:
+            logger.info(f"Using cached chunks for query: '{query[:50]}...'")
+            return cached_chunks
+        
         logger.info(f"Retrieving relevant chunks for query: '{query[:50]}...'")
         
         # Get initial results
@@ -122,8 +134,13 @@ class OllamaRAGSystem:
         selected_chunks = self._select_chunks_for_context(improved_results)
         
         logger.info(f"Retrieved {len(selected_chunks)} relevant chunks")
+        self._retrieval_cache.put(cache_key, selected_chunks, self.embedding_system.store_version)
         return selected_chunks
     
+    def clear_cache(self) -> None:
+        """Forget cached retrievals, e.g. after chunks were re-ingested by another process."""
+        self._retrieval_cache.clear()
+    
     def _enhance_chunk_ranking(self, chunks: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
         """Enhance chunk ranking with query-specific scoring."""
         query_lower = query.lower()
@@ -144,8 +161,8 @@ class OllamaRAGSystem:
             keyword_bonus = keyword_matches / len(query_words) * 0.1
             
             # Title relevance bonus
-            title = metadata.get('title', '')
-            title_matches = sum(1 for word in query_words if word in title.lower())
+            title_lower = metadata.get('title', '').lower()
+            title_matches = sum(1 for word in query_words if word in title_lower)
             title_bonus = title_matches / len(query_words) * 0.2
             
             # Content length penalty
@@ -165,27 +182,25 @@ class OllamaRAGSystem:
             enhanced_chunks.append(enhanced_chunk)
         
         # Sort by enhanced score
-        enhanced_chunks.sort(key=lambda x: x['enhanced_score'], reverse=True)
+        enhanced_chunks.sort(key=itemgetter('enhanced_score'), reverse=True)
         return enhanced_chunks
     
     def _select_chunks_for_context(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Select chunks that fit within the context window."""
-        selected_chunks = []
         current_length = 0
+        count = 0
         
-        for chunk in chunks:
-            content_length = len(chunk.get('content', ''))
+        for chunk in chunks[:self.max_context_chunks]:
+            content_length = chunk.get('content_length')
+            if content_length is None:
+                content_length = len(chunk.get('content', ''))
             
-            if current_length + content_length > self.context_window:
-                break
-            
-            selected_chunks.append(chunk)
             current_length += content_length
-            
-            if len(selected_chunks) >= self.max_context_chunks:
+            if current_length > self.context_window:
                 break
+            count += 1
         
-        return selected_chunks
+        return chunks[:count]
     
     def build_comprehensive_context(self, chunks: List[Dict[str, Any]], query: str) -> str:
         """Build comprehensive context with metadata."""
@@ -13,7 +13,7 @@ import os
 import sys
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import json
 
 # Add project root to path
@@ -34,6 +34,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from rag_app.common_setup import RetrievalCache, TRUNCATED_ANSWER_NOTICE
 from rag_app.embeddings_sentence_transformers import SentenceTransformersEmbeddingSystem
 
 
@@ -54,6 +55,7 @@ class RAGSystem:
         """
         self.max_context_chunks = max_context_chunks
         self.context_window = context_window
+        self._retrieval_cache = RetrievalCache()  # (query, n_results) -> retrieved chunks
         
         # Initialize embedding system
         if embedding_system:
@@ -78,16 +80,27 @@ class RAGSystem:
         if n_results is None:
             n_results = self.max_context_chunks
             
+        cache_key = (query, n_results)
+        cached_chunks = self._retrieval_cache.get(cache_key, self.embedding_system.store_version)
+        if cached_chunks is not None:
+            logger.info(f"Using cached chunks for query: '{query[:50]}...'")
+            return cached_chunks
+        
         logger.info(f"Retrieving relevant chunks for query: '{query[:50]}...'")
         
         try:
             results = self.embedding_system.query_vectors(query, n_results=n_results)
             logger.info(f"Retrieved {len(results)} relevant chunks")
+            self._retrieval_cache.put(cache_key, results, self.embedding_system.store_version)
             return results
         except Exception as e:
             logger.error(f"Error retrieving chunks: {e}")
             return []
     
+    def clear_cache(self) -> None:
+        """Forget cached retrievals, e.g. after chunks were re-ingested by another process."""
+        self._retrieval_cache.clear()
+    
     def build_context(self, chunks: List[Dict[str, Any]]) -> str:
         """
         Build context string from retrieved chunks.
@@ -161,16 +174,21 @@ class RAGSystem:
         
         return prompt
     
-    def answer_question(self, query: str, use_llm: bool = False) -> Dict[str, Any]:
+    def answer_question(self, query: str, use_llm: bool = False,
+                        on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Answer a question using the RAG system.
         
         Args:
             query: User's question
             use_llm: Whether to use LLM generation (requires OpenAI API key)
+            on_token: Optional callback that receives the answer text as it is
+                produced: LLM completions are streamed piece by piece, other
+                answers arrive in one piece. The full answer is still returned.
             
         Returns:
-            Dictionary with answer and metadata
+            Dictionary with answer and metadata; 'truncated' is True when the
+            LLM stream broke off partway and the answer is incomplete
         """
         logger.info(f"Processing question: '{query[:50]}...'")
         
@@ -178,8 +196,11 @@ class RAGSystem:
         chunks = self.retrieve_relevant_chunks(query)
         
         if not chunks:
+            answer = "I couldn't find any relevant information to answer your question."
+            if on_token:
+                on_token(answer)
             return {
-                'answer': "I couldn't find any relevant information to answer your question.",
+                'answer': answer,
                 'sources': [],
                 'context': "",
                 'method': 'retrieval_only'
@@ -189,14 +210,17 @@ class RAGSystem:
         context = self.build_context(chunks)
         
         # Step 3: Generate response
+        truncated = False
         if use_llm:
             # Use LLM for generation (requires OpenAI API)
-            answer = self._generate_with_llm(query, context)
+            answer, truncated = self._generate_with_llm(query, context, on_token)
             method = 'rag_with_llm'
         else:
             # Use retrieval-only approach
             answer = self._generate_retrieval_only(query, chunks)
             method = 'retrieval_only'
+            if on_token:
+                on_token(answer)
         
         # Prepare sources
         sources = []
@@ -213,7 +237,8 @@ class RAGSystem:
             'sources': sources,
             'context': context,
             'method': method,
-            'num_sources': len(sources)
+            'num_sources': len(sources),
+            'truncated': truncated
         }
         
         logger.info(f"Generated answer using {method} with {len(sources)} sources")
@@ -237,8 +262,17 @@ class RAGSystem:
         
         return answer
     
-    def _generate_with_llm(self, query: str, context: str) -> str:
-        """Generate answer using LLM (requires OpenAI API key)."""
+    def _generate_with_llm(self, query: str, context: str,
+                           on_token: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+        """
+        Generate answer using LLM (requires OpenAI API key).
+        
+        With on_token the completion is streamed and each piece is passed to it
+        as it arrives; fallback messages are passed to it whole. Returns the
+        answer and whether the stream broke off partway, in which case the
+        answer (and on_token) ends with TRUNCATED_ANSWER_NOTICE.
+        """
+        parts = []
         try:
             from openai import OpenAI
             
@@ -246,7 +280,10 @@ class RAGSystem:
             api_key = os.getenv('OPENAI_API_KEY')
             if not api_key:
                 logger.warning("OpenAI API key not found, falling back to retrieval-only")
-                return self._generate_retrieval_only(query, [])
+                answer = self._generate_retrieval_only(query, [])
+                if on_token:
+                    on_token(answer)
+                return answer, False
             
             # Initialize OpenAI client
             client = OpenAI(api_key=api_key)
@@ -255,7 +292,7 @@ class RAGSystem:
             prompt = self.generate_prompt(query, context)
             
             # Call OpenAI API
-            response = client.chat.completions.create(
+            request = dict(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are an expert system design interviewer and technical mentor."},
@@ -265,11 +302,28 @@ class RAGSystem:
                 temperature=0.7
             )
             
-            return response.choices[0].message.content
+            if on_token is None:
+                response = client.chat.completions.create(**request)
+                return response.choices[0].message.content, False
+            
+            # Stream the completion so the first tokens show up right away
+            for chunk in client.chat.completions.create(**request, stream=True):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    on_token(delta)
+            return "".join(parts), False
             
         except Exception as e:
             logger.error(f"Error generating with LLM: {e}")
-            return "Error generating answer with LLM. Please try again."
+            if parts:
+                # Keep what was already shown, but mark it as incomplete
+                on_token(TRUNCATED_ANSWER_NOTICE)
+                return "".join(parts) + TRUNCATED_ANSWER_NOTICE, True
+            answer = "Error generating answer with LLM. Please try again."
+            if on_token:
+                on_token(answer)
+            return answer, False
     
     def get_system_stats(self) -> Dict[str, Any]:
         """Get statistics about the RAG system."""
@@ -1051,7 +1051,9 @@ async def save_blog_content_to_database(blog_data, storage_dir):
             'CREATE INDEX IF NOT EXISTS idx_blog_company ON blog_content(company)',
             'CREATE INDEX IF NOT EXISTS idx_blog_year ON blog_content(year)',
             'CREATE INDEX IF NOT EXISTS idx_blog_extraction_method ON blog_content(extraction_method)',
-            'CREATE INDEX IF NOT EXISTS idx_blog_created_at ON blog_content(created_at)'
+            'CREATE INDEX IF NOT EXISTS idx_blog_created_at ON blog_content(created_at)',
+            # Serves the rag_app "content_length > 500 ORDER BY content_length DESC" loads
+            'CREATE INDEX IF NOT EXISTS idx_blog_content_length ON blog_content(content_length)'
         ]
         
         for index_sql in indexes:
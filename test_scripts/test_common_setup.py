@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for the helpers shared by the RAG systems.
+
+Run with: python -m pytest test_scripts/test_common_setup.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from rag_app.common_setup import RetrievalCache
+
+
+def test_retrieval_cache_is_invalidated_when_store_version_changes():
+    """Chunks cached before new chunks were stored are not returned afterwards."""
+    cache = RetrievalCache()
+    key = ("How does sharding work?", 5)
+    cache.put(key, [{'content': "old chunk"}], version=0)
+
+    assert cache.contains(key, version=0)
+    assert cache.get(key, version=0) == [{'content': "old chunk"}]
+
+    assert not cache.contains(key, version=1)
+    assert cache.get(key, version=1) is None
+    # Going back to the old version does not bring the stale entry back
+    assert cache.get(key, version=0) is None
+
+
+def test_retrieval_cache_returns_copies():
+    """Editing returned chunks does not change what later lookups get."""
+    cache = RetrievalCache()
+    key = ("What is a CDN?", 3)
+    cache.put(key, [{'content': "edge caching", 'metadata': {'title': "CDNs"}}], version=0)
+
+    chunks = cache.get(key, version=0)
+    chunks[0]['metadata']['title'] = "edited"
+
+    assert cache.get(key, version=0)[0]['metadata']['title'] == "CDNs"
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the blog content categorizer.
+
+Run with: python -m pytest test_scripts/test_content_categorizer.py
+"""
+
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from rag_app.data_processing.content_categorizer import BlogContentProcessor, ContentCategorizer
+
+
+@pytest.fixture(scope="module")
+def categorizer():
+    return ContentCategorizer()
+
+
+def test_tfidf_scores_match_sklearn_transform(categorizer):
+    """The hand-rolled transform scores blogs exactly like the fitted vectorizer."""
+    vectorizer = TfidfVectorizer(
+        stop_words='english',
+        max_features=1000,
+        ngram_range=(1, 2),
+        norm='l2',
+        lowercase=False,
+        dtype=np.float32
+    )
+    topic_matrix = vectorizer.fit_transform(
+        [categorizer.TOPIC_DESCRIPTIONS[topic].lower() for topic in categorizer.topic_names]
+    )
+    titles = ["Scaling Our Database Layer", "", "Event-Driven Microservices", "Team Offsite"]
+    contents = [
+        "We moved to database sharding and read replicas to handle load balancing of queries.",
+        "A distributed cache with Redis cut latency; cache invalidation was the hard part.",
+        "Message queues and Kafka streams decouple services in our microservices architecture.",
+        "Photos from the offsite, with nothing technical in them at all.",
+    ]
+
+    texts = [f"{title} {content}" for title, content in zip(titles, contents)]
+    expected = (vectorizer.transform([text.lower() for text in texts]) @ topic_matrix.T).toarray()
+
+    scores = categorizer.categorize_by_tfidf_batch(texts)
+    assert scores.shape == (len(texts), len(categorizer.topic_names))
+    np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+    for title, content, expected_row in zip(titles, contents, expected):
+        topic_scores = categorizer.categorize_by_tfidf(content, title)
+        np.testing.assert_allclose([topic_scores[topic] for topic in categorizer.topic_names],
+                                   expected_row, atol=1e-5)
+
+
+def test_save_categorized_data_backfills_company_on_old_table(tmp_path):
+    """Rows saved before blog_topics had a company column get it from blog_content."""
+    db_path = tmp_path / "table_data.db"
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executescript("""
+            CREATE TABLE blog_content (blog_id TEXT PRIMARY KEY, company TEXT);
+            CREATE TABLE blog_topics (
+                blog_id TEXT PRIMARY KEY,
+                primary_topic TEXT,
+                topic_scores TEXT,
+                top_topics TEXT
+            );
+            INSERT INTO blog_content VALUES ('old-post', 'Netflix'), ('new-post', 'Uber');
+            INSERT INTO blog_topics VALUES ('old-post', 'caching', '{}', '[]');
+        """)
+
+    processor = BlogContentProcessor(str(db_path))
+    try:
+        processor.save_categorized_data([{
+            'blog_id': 'new-post',
+            'primary_topic': 'databases',
+            'topic_scores': {'databases': 0.5},
+            'top_topics': [('databases', 0.5)],
+            'company': 'Uber'
+        }])
+    finally:
+        processor.close()
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        companies = dict(conn.execute("SELECT blog_id, company FROM blog_topics"))
+    assert companies == {'old-post': 'Netflix', 'new-post': 'Uber'}
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for opening the ChromaDB collection used by the embedding system.
+
+Run with: python -m pytest test_scripts/test_embeddings_collection.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from rag_app.embeddings_sentence_transformers import _open_collection
+
+
+def test_existing_cosine_collection_is_opened_unchanged(tmp_path):
+    """A store built with cosine distance keeps it and its stored vectors."""
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    existing = client.create_collection(name="blog_chunks", metadata={"hnsw:space": "cosine"})
+    existing.add(ids=["chunk_0"], embeddings=[[0.6, 0.8]], documents=["stored chunk"])
+    
+    collection = _open_collection(client, "blog_chunks")
+    
+    assert collection.metadata["hnsw:space"] == "cosine"
+    assert collection.count() == 1
+    results = collection.query(query_embeddings=[[0.6, 0.8]], n_results=1)
+    assert results["documents"][0] == ["stored chunk"]
+    assert 1 - results["distances"][0][0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_new_collection_uses_inner_product(tmp_path):
+    """Collections created by the embedding system use inner-product space."""
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    
+    collection = _open_collection(client, "blog_chunks")
+    
+    assert collection.metadata["hnsw:space"] == "ip"
+    assert _open_collection(client, "blog_chunks").count() == 0
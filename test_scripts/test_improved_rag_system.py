@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for context selection in the improved RAG system.
+
+Run with: python -m pytest test_scripts/test_improved_rag_system.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root and rag_app to Python path; the RAG modules import
+# their siblings by bare name
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "rag_app"))
+
+tiktoken = pytest.importorskip("tiktoken")
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from improved_rag_system import ImprovedRAGSystem, OPENAI_SYSTEM_PROMPT
+
+
+class FakeEmbeddingSystem:
+    """Stands in for the vector store; context selection never queries it."""
+
+    store_version = 0
+
+
+def _chunks(n):
+    return [{
+        'content': f"Sharding spreads writes for tenant {i} across many database nodes. " * 30,
+        'metadata': {
+            'title': f"Sharding at Scale, Part {i}",
+            'company': "Example",
+            'url': f"https://example.com/blog/sharding-{i}",
+            'chunk_type': 'paragraph'
+        },
+        'enhanced_score': 1.0 - i / 100
+    } for i in range(n)]
+
+
+@pytest.fixture
+def rag():
+    rag = ImprovedRAGSystem(embedding_system=FakeEmbeddingSystem(), use_openai=False)
+    # Budget in tokens as an OpenAI-enabled system would, without an API key
+    rag._encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+    return rag
+
+
+def _prompt_tokens(rag, chunks, query):
+    """Tokens sent to OpenAI for a question answered from these chunks."""
+    context = rag.build_comprehensive_context(chunks, query)
+    prompt = rag._build_prompt(query, context)
+    return len(rag._encoding.encode(OPENAI_SYSTEM_PROMPT)) + len(rag._encoding.encode(prompt))
+
+
+def test_selected_chunks_keep_prompt_within_token_budget(rag):
+    """Instructions and source headers count towards context_window_tokens."""
+    query = "How should I shard a multi-tenant database?"
+    chunks = _chunks(10)
+
+    selected = rag._select_chunks_for_context(chunks, query)
+
+    assert rag.token_budgeting
+    assert 0 < len(selected) < rag.max_context_chunks
+    assert selected == chunks[:len(selected)]
+    assert _prompt_tokens(rag, selected, query) <= rag.context_window_tokens
+
+
+def test_larger_token_budget_selects_more_chunks(rag):
+    query = "How should I shard a multi-tenant database?"
+    chunks = _chunks(10)
+    n_default = len(rag._select_chunks_for_context(chunks, query))
+
+    rag.context_window_tokens = 3000
+    selected = rag._select_chunks_for_context(chunks, query)
+
+    assert len(selected) > n_default
+    assert _prompt_tokens(rag, selected, query) <= rag.context_window_tokens
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for answer generation in the basic RAG system.
+
+Run with: python -m pytest test_scripts/test_rag_system.py
+"""
+
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from rag_app.common_setup import TRUNCATED_ANSWER_NOTICE
+from rag_app.rag_system import RAGSystem
+
+
+class FakeEmbeddingSystem:
+    """Returns the same chunks for every query, without a model or vector store."""
+
+    store_version = 0
+
+    def query_vectors(self, query, n_results=5):
+        return [{
+            'content': "Put a cache in front of the database to absorb repeated reads.",
+            'metadata': {'title': "Scaling Reads", 'company': "Example"},
+            'score': 0.9
+        }]
+
+
+def _stream_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def test_stream_failing_partway_returns_truncated_answer(monkeypatch):
+    """Text already streamed is kept and marked as cut off."""
+    def create(**request):
+        assert request["stream"]
+        yield _stream_chunk("Use a cache")
+        yield _stream_chunk(" in front of")
+        raise ConnectionError("stream reset by peer")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    fake_openai = types.ModuleType("openai")
+    fake_openai.OpenAI = lambda api_key: client
+    monkeypatch.setitem(sys.modules, "openai", fake_openai)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    rag = RAGSystem(embedding_system=FakeEmbeddingSystem())
+    pieces = []
+    result = rag.answer_question("How do I scale reads?", use_llm=True, on_token=pieces.append)
+
+    assert result['truncated'] is True
+    assert result['answer'] == "Use a cache in front of" + TRUNCATED_ANSWER_NOTICE
+    assert result['answer'].endswith(TRUNCATED_ANSWER_NOTICE)
+    assert "".join(pieces) == result['answer']